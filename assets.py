@@ -0,0 +1,69 @@
+import os
+import pygame
+
+ASSET_DIR = "assets"
+ARROW_SIZE = (20, 20)
+ARROW_ANGLE_STEP = 2  # Degrees between pre-rotated arrow frames
+
+
+# Asset cache so every image is read from disk and converted only once
+class AssetCache:
+    def __init__(self, asset_dir=ASSET_DIR):
+        self.asset_dir = asset_dir
+        self._images = {}  # name -> converted source image
+        self._scaled = {}  # (name, size) -> scaled image
+        self._decoded = {}  # name -> image decoded in the background, not converted yet
+        self._arrow_frames = None  # Pre-rotated arrow frames, built on first use
+        self.convert = True  # Off when no display surface exists, as with the texture backend
+
+    def path(self, name):
+        return os.path.join(self.asset_dir, name)
+
+    def image(self, name):
+        image = self._images.get(name)
+        if image is None:
+            raw = self._decoded.pop(name, None)
+            if raw is None:
+                raw = pygame.image.load(self.path(name))
+            image = raw.convert_alpha() if self.convert else raw
+            self._images[name] = image
+        return image
+
+    def decode(self, names):
+        # Safe to run in a worker thread: only file I/O and PNG decoding happen here,
+        # conversion to the display format is left to image() on the main thread
+        for name in names:
+            if name not in self._images and name not in self._decoded:
+                self._decoded[name] = pygame.image.load(self.path(name))
+
+    def scaled(self, name, size):
+        key = (name, size)
+        image = self._scaled.get(key)
+        if image is None:
+            image = pygame.transform.scale(self.image(name), size)
+            self._scaled[key] = image
+        return image
+
+    def build_arrow_frames(self):
+        # Rotate first and scale afterwards, the same order Arrow used to apply per shot
+        arrow = self.image("arrow.png")
+        self._arrow_frames = [
+            pygame.transform.scale(pygame.transform.rotate(arrow, -step * ARROW_ANGLE_STEP), ARROW_SIZE)
+            for step in range(360 // ARROW_ANGLE_STEP)
+        ]
+
+    def arrow_frame(self, angle):
+        if self._arrow_frames is None:
+            self.build_arrow_frames()
+        index = int(round(angle / ARROW_ANGLE_STEP)) % len(self._arrow_frames)
+        return self._arrow_frames[index]
+
+    def clear(self):
+        self._images.clear()
+        self._scaled.clear()
+        self._decoded.clear()
+        self._arrow_frames = None
+
+
+# Shared cache used by the sprites; images are loaded lazily once a display mode is set
+assets = AssetCache()
@@ -0,0 +1,120 @@
+import argparse
+import csv
+import itertools
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+HP_SAMPLE_INTERVAL = 1000  # Milliseconds of game time between HP curve samples
+
+FIELDS = [
+    "levels", "spawn_interval_decay", "ball_speed_ramp", "boss_shoot_cooldown", "policy", "seed",
+    "outcome", "duration_ms", "ticks", "final_level", "balls_destroyed", "time_to_level", "hp_curve",
+]
+
+
+def quiet_worker():
+    # The game prints level changes; keep workers from flooding the console
+    sys.stdout = open(os.devnull, "w")
+
+
+def run_session(params, policy_name, seed, duration_ms):
+    # Runs one display-free session in a worker process and returns its result row
+    import headless  # Selects the dummy SDL drivers in the worker before pygame starts
+
+    policy = headless.POLICIES[policy_name]
+    if policy is headless.RandomPolicy:
+        policy = headless.RandomPolicy(seed)
+    game = headless.HeadlessGame(seed=seed, policy=policy)
+    game.levels = list(params["levels"])
+    game.total_balls_needed = game.levels[0]
+    game.spawn_interval_decay = params["spawn_interval_decay"]
+    game.ball_speed_ramp = params["ball_speed_ramp"]
+    game.ramp_ball_motion = True  # Otherwise the ramp would not change how balls move
+    game.boss_shoot_cooldown = params["boss_shoot_cooldown"]
+
+    level_times = []
+    hp_curve = [game.player.hp]
+    level = 0
+    next_sample = HP_SAMPLE_INTERVAL
+    while game.running and game.sim_clock.time < duration_ms:
+        game.step()
+        if game.current_level != level:
+            level = game.current_level
+            level_times.append(game.get_ticks())
+        if game.get_ticks() >= next_sample:
+            hp_curve.append(game.player.hp)
+            next_sample += HP_SAMPLE_INTERVAL
+
+    row = dict(params)
+    row.update({
+        "levels": " ".join(map(str, params["levels"])),
+        "policy": policy_name,
+        "seed": seed,
+        "outcome": game.outcome or "timeout",
+        "duration_ms": game.get_ticks(),
+        "ticks": game.tick,
+        "final_level": game.current_level + 1,
+        "balls_destroyed": game.total_balls_destroyed,
+        "time_to_level": " ".join(map(str, level_times)),
+        "hp_curve": " ".join(map(str, hp_curve)),
+    })
+    return row
+
+
+def parameter_grid(levels, decays, ramps, cooldowns):
+    for values in itertools.product(levels, decays, ramps, cooldowns):
+        yield dict(zip(("levels", "spawn_interval_decay", "ball_speed_ramp", "boss_shoot_cooldown"), values))
+
+
+def run_batch(grid, policy, seeds, duration_ms, out_path, workers=None):
+    # Fans the sessions out over all cores and streams each row to the CSV as it finishes
+    sessions = [(params, seed) for params in grid for seed in range(seeds)]
+    summary = {}
+    with open(out_path, "w", newline="") as f, ProcessPoolExecutor(max_workers=workers, initializer=quiet_worker) as executor:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        futures = [executor.submit(run_session, params, policy, seed, duration_ms) for params, seed in sessions]
+        for future in as_completed(futures):
+            row = future.result()
+            writer.writerow(row)
+            f.flush()
+            key = (row["levels"], row["spawn_interval_decay"], row["ball_speed_ramp"], row["boss_shoot_cooldown"])
+            stats = summary.setdefault(key, {"sessions": 0, "wins": 0, "duration_ms": 0})
+            stats["sessions"] += 1
+            stats["wins"] += row["outcome"] == "win"
+            stats["duration_ms"] += row["duration_ms"]
+    return summary
+
+
+def parse_levels(text):
+    return tuple(int(count) for count in text.split(","))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run headless game sessions over a parameter grid in parallel")
+    parser.add_argument("--levels", type=parse_levels, nargs="+", default=[(20, 35, 60, 100)],
+                        help="balls per level, comma separated; several values sweep them")
+    parser.add_argument("--spawn-decay", type=float, nargs="+", default=[0.7])
+    parser.add_argument("--speed-ramp", type=float, nargs="+", default=[1.3],
+                        help="ball speed multiplier per level; unlike the shipped game, balls really speed up")
+    parser.add_argument("--boss-cooldown", type=int, nargs="+", default=[2000])
+    parser.add_argument("--policy", default="aim", choices=["idle", "aim", "random"])
+    parser.add_argument("--seeds", type=int, default=8, help="sessions per parameter combination")
+    parser.add_argument("--minutes", type=float, default=10, help="game time limit per session")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--out", default="batch_results.csv")
+    args = parser.parse_args()
+
+    grid = list(parameter_grid(args.levels, args.spawn_decay, args.speed_ramp, args.boss_cooldown))
+    started = time.perf_counter()
+    summary = run_batch(grid, args.policy, args.seeds, args.minutes * 60000, args.out, args.workers)
+    elapsed = time.perf_counter() - started
+
+    for key, stats in summary.items():
+        print("levels {} decay {} ramp {} cooldown {}: ".format(*key) +
+              f"{stats['wins']}/{stats['sessions']} wins, "
+              f"mean length {stats['duration_ms'] / stats['sessions'] / 1000:.1f}s")
+    print(f"{sum(s['sessions'] for s in summary.values())} sessions in {elapsed:.1f}s with {args.workers} workers, "
+          f"results in {args.out}")
@@ -0,0 +1,61 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+BACKENDS = ["surface", "gpu"]
+
+
+def bench_backend(backend, counts, frames, window):
+    # Times Game.draw() with a fixed scene of each size; runs in its own process so
+    # each backend gets a fresh SDL video state
+    if not window:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    sys.stdout = open(os.devnull, "w")
+    import headless
+
+    results = []
+    for count in counts:
+        game = headless.HeadlessGame(seed=0, backend=backend)
+        game.current_level = 1  # Has a pointer image
+        rng = game.rng
+        w, h = game.screen_width, game.screen_height
+        balls = [game.new_ball((rng.uniform(0, w), rng.uniform(0, h), w // 2, h // 2)) for _ in range(count)]
+        game.balls.add(balls)
+        game.all_sprites.add(balls)
+        for _ in range(count // 2):
+            game.player.arrows.add(game.arrow_pool.acquire(rng.uniform(0, w), rng.uniform(0, h), rng.uniform(-180, 180)))
+        soybeans = [game.new_soybean(0) for _ in range(max(count // 20, 1))]
+        game.soybeans.add(soybeans)
+        game.all_sprites.add(soybeans)
+
+        times = []
+        for _ in range(frames):
+            game.sim_clock.advance(game.timestep)  # Moves the aura pulse; sprites stay put
+            game.tick_clock()
+            game.profiler.begin_frame()
+            started = time.perf_counter()
+            game.draw()
+            times.append((time.perf_counter() - started) * 1000)
+            game.profiler.end_frame(len(game.balls), len(game.player.arrows), len(game.soybeans))
+        times.sort()
+        sprites = len(game.all_sprites) + len(game.player.arrows) + len(game.soybeans)
+        results.append((count, sprites, sum(times) / frames, times[int(frames * 0.99)]))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the Surface and SDL2 renderer backends at high entity counts")
+    parser.add_argument("--counts", type=int, nargs="+", default=[100, 1000, 5000], help="balls on screen")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--backend", choices=BACKENDS, nargs="+", default=BACKENDS)
+    parser.add_argument("--window", action="store_true", help="use the real video driver instead of the dummy one")
+    args = parser.parse_args()
+
+    print(f"{'backend':<8} {'balls':>6} {'sprites':>8} {'mean ms':>8} {'p99 ms':>8} {'fps':>7}")
+    for backend in args.backend:
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            results = executor.submit(bench_backend, backend, args.counts, args.frames, args.window).result()
+        for count, sprites, mean, p99 in results:
+            print(f"{backend:<8} {count:>6} {sprites:>8} {mean:>8.2f} {p99:>8.2f} {1000 / mean:>7.0f}")
@@ -0,0 +1,237 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+BASELINE_PATH = "bench_baseline.json"  # Recorded per machine with --save, not committed
+WARMUP_FRAMES = 30  # Untimed frames first, also the window peak memory is measured over
+THRESHOLD = 0.25  # Allowed slowdown of a phase, as a fraction of its baseline ns/entity
+MEMORY_THRESHOLD = 0.10  # Allowed growth of the peak Python heap
+NOISE_NS = 20  # Smaller ns/entity differences are timer noise, never a regression
+NOISE_KB = 256
+PLAYER_HP = 10 ** 6  # The player survives every scenario
+ARROWS_PER_TICK = 8
+
+
+def add_balls(game, count):
+    # Balls anywhere on screen heading for random points, so they cross each other and the player
+    rng = game.rng
+    w, h = game.screen_width, game.screen_height
+    balls = [game.new_ball((rng.uniform(0, w), rng.uniform(0, h), rng.uniform(0, w), rng.uniform(0, h)))
+             for _ in range(count)]
+    game.balls.add(balls)
+    game.all_sprites.add(balls)
+
+
+def keep_balls(count):
+    # Tops the balls back up to count before each frame, outside the timed phases
+    def feed(game):
+        if len(game.balls) < count:
+            add_balls(game, count - len(game.balls))
+    return feed
+
+
+def arrow_spam(game):
+    # Spins a fan of arrows out of the player every tick
+    start = game.tick * 7 % 360
+    return game.keys, [start + i * 360 / ARROWS_PER_TICK for i in range(ARROWS_PER_TICK)]
+
+
+def soybean_field(count, balls):
+    def feed(game):
+        keep_balls(balls)(game)
+        now = game.get_ticks()
+        for soybean in game.soybeans:
+            soybean.spawn_time = now  # Never expire, only the aura phase moves
+        if len(game.soybeans) < count:
+            soybeans = [game.new_soybean(now) for _ in range(count - len(game.soybeans))]
+            game.soybeans.add(soybeans)
+            game.all_sprites.add(soybeans)
+    return feed
+
+
+def boss_volleys(balls):
+    # Final level with a boss that fires a volley every tick
+    def setup(game):
+        game.current_level = len(game.levels)
+        game.boss_shoot_cooldown = 0
+        game.start_boss_level()
+        return keep_balls(balls)
+    return setup
+
+
+# name: (setup taking the game and returning the per-frame feed, Game keyword arguments, bot policy)
+SCENARIOS = {
+    "balls_100": (lambda game: keep_balls(100), {}, None),
+    "balls_1k": (lambda game: keep_balls(1000), {}, None),
+    "balls_10k": (lambda game: keep_balls(10000), {}, None),
+    "balls_10k_engine": (lambda game: keep_balls(10000), {"use_projectile_engine": True}, None),
+    "arrow_spam": (lambda game: keep_balls(1000), {}, arrow_spam),
+    "soybean_auras": (lambda game: soybean_field(500, 100), {}, None),
+    "boss_volleys": (boss_volleys(200), {}, None),
+}
+
+
+def run_scenario(name, frames):
+    # Runs in its own process, for a fresh SDL state and an honest peak memory figure
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    sys.stdout = open(os.devnull, "w")
+    import headless
+    from profiler import FrameProfiler, PHASES
+
+    setup, kwargs, policy = SCENARIOS[name]
+    tracemalloc.start()
+    game = headless.HeadlessGame(seed=0, **kwargs)
+    game.scheduler.reset()
+    game.scheduler.started = True  # No natural spawns, the scenario sets the load
+    game.player.hp = PLAYER_HP
+    if policy is not None:
+        game.policy = policy
+    feed = setup(game)
+
+    def frame():
+        feed(game)
+        game.tick += 1
+        game.profiler.begin_frame()
+        game.sim_clock.advance(game.timestep)
+        game.tick_clock()
+        game.keys, shots = game.policy(game)
+        for angle in shots:
+            game.player.shoot(angle)
+        game.profiler.lap("events")
+        game.update()
+        game.draw()
+        game.profiler.end_frame(len(game.balls), len(game.player.arrows), len(game.soybeans))
+
+    for _ in range(WARMUP_FRAMES):
+        frame()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    profiler = game.profiler = FrameProfiler(capacity=frames)
+    for _ in range(frames):
+        frame()
+
+    slots = list(profiler.recorded())
+    entities = [profiler.counts["balls"][i] + profiler.counts["arrows"][i] + profiler.counts["soybeans"][i] + 1
+                for i in slots]  # Plus the player
+    phases = {}
+    for phase in PHASES:
+        per_entity = sorted(profiler.times[phase][i] / count for i, count in zip(slots, entities))
+        phases[phase] = round(per_entity[len(per_entity) // 2], 1)  # Median frame
+    frame_ms = profiler.frame_percentile(0.5)
+    return {
+        "entities": round(sum(entities) / len(entities)),
+        "ns_per_entity": phases,
+        "frame_ms_p50": round(frame_ms, 3),
+        "frame_ms_p99": round(profiler.frame_percentile(0.99), 3),
+        "fps": round(1000 / frame_ms, 1),
+        "peak_kb": round(peak / 1024),
+    }
+
+
+def machine():
+    # What the timings depend on besides the code; baselines only compare on the same machine
+    cpu = platform.processor()
+    try:
+        with open("/proc/cpuinfo") as f:
+            cpu = next(line.split(":", 1)[1].strip() for line in f if line.startswith("model name"))
+    except (OSError, StopIteration):
+        pass
+    return {"platform": platform.platform(), "python": platform.python_version(), "cpu": cpu or platform.machine(),
+            "cpus": os.cpu_count()}
+
+
+def regressions(results, baseline, threshold, memory_threshold):
+    # Descriptions of every phase or peak that got worse than the baseline allows
+    found = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for phase, value in result["ns_per_entity"].items():
+            old = base["ns_per_entity"].get(phase)
+            if old is not None and value > old * (1 + threshold) and value - old > NOISE_NS:
+                found.append(f"{name} {phase}: {value} ns/entity, baseline {old}")
+        old = base["peak_kb"]
+        if result["peak_kb"] > old * (1 + memory_threshold) and result["peak_kb"] - old > NOISE_KB:
+            found.append(f"{name} peak memory: {result['peak_kb']} KB, baseline {old}")
+    return found
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stress scenarios on the SDL dummy driver, checked against a baseline")
+    parser.add_argument("--scenarios", choices=sorted(SCENARIOS), nargs="+", default=list(SCENARIOS))
+    parser.add_argument("--frames", type=int, default=120, help="timed frames per scenario")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save", action="store_true", help="store these results as the baseline instead of comparing")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="allowed ns/entity slowdown per phase")
+    parser.add_argument("--memory-threshold", type=float, default=MEMORY_THRESHOLD, help="allowed peak memory growth")
+    parser.add_argument("--output", help="also write the results to this JSON file")
+    parser.add_argument("--any-machine", action="store_true",
+                        help="compare against a baseline recorded on a different machine, with a warning")
+    args = parser.parse_args()
+
+    # Check the baseline before spending minutes on the scenarios
+    current = machine()
+    baseline = None
+    if not args.save:
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}, record one on this machine with --save first")
+            sys.exit(2)
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        differs = {key: (baseline["machine"].get(key), value) for key, value in current.items()
+                   if baseline["machine"].get(key) != value}
+        for key, (old, new) in differs.items():
+            print(f"{'WARNING' if args.any_machine else 'ERROR'}: baseline {key} {old!r}, this machine {new!r}")
+        if differs and not args.any_machine:
+            print("Timings from another machine say nothing about the code; re-record the baseline here "
+                  "with --save, or pass --any-machine to compare anyway")
+            sys.exit(2)
+        if differs:
+            print("WARNING: comparing against another machine's baseline, regressions may be hardware differences")
+
+    from profiler import PHASES
+
+    results = {}
+    print(f"{'scenario':<18} {'entities':>8} " + " ".join(f"{p:>14}" for p in PHASES) +
+          f" {'p50 ms':>8} {'fps':>7} {'peak KB':>8}")
+    for name in args.scenarios:
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            result = results[name] = executor.submit(run_scenario, name, args.frames).result()
+        print(f"{name:<18} {result['entities']:>8} " +
+              " ".join(f"{result['ns_per_entity'][p]:>14.1f}" for p in PHASES) +
+              f" {result['frame_ms_p50']:>8.2f} {result['fps']:>7.0f} {result['peak_kb']:>8}")
+    print("Phase columns are median ns per entity")
+
+    report = {
+        "machine": current,
+        "frames": args.frames,
+        "scenarios": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=1)
+    if args.save:
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                stored = json.load(f)
+            if stored["machine"] == current:
+                stored["scenarios"].update(results)  # Keep scenarios that were not run this time
+                report["scenarios"] = stored["scenarios"]
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=1)
+        print(f"Baseline saved to {args.baseline}")
+        sys.exit(0)
+
+    found = regressions(results, baseline["scenarios"], args.threshold, args.memory_threshold)
+    for line in found:
+        print("REGRESSION " + line)
+    if found:
+        sys.exit(1)
+    print(f"No regressions against {args.baseline}")
@@ -0,0 +1,489 @@
+import os
+import sys
+
+# The server and the bot benchmark run without a window; only clients open one
+if sys.argv[1:2] != ["client"]:
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import asyncio
+import math
+import random
+import struct
+import time
+from array import array
+from collections import deque
+import pygame
+import main
+import netsync
+from recording import key_mask, mask_keys
+from sim import PressedKeys, NO_KEYS
+from sweep import swept_spritecollide
+
+HOST = "127.0.0.1"
+PORT = 50007
+FRAME = struct.Struct("<I")  # Length prefix of every message
+# Acked snapshot tick, key mask, shot count, then float32 angles. Inputs carry no tick of their
+# own: the server applies the newest mask and every shot received so far on its next tick
+INPUT = struct.Struct("<IBB")
+WELCOME = struct.Struct("<BB")  # Player index, tick rate
+HISTORY = 64  # Snapshots kept on both ends as delta baselines
+INTERPOLATION_DELAY = 50  # Milliseconds clients render behind the newest snapshot
+FULL_SIZE_EVERY = 30  # Ticks between samples of the uncompressed snapshot size
+CHECK_LAGS = (1, 2, 5, 20, HISTORY - 1)  # Baseline ages, in ticks, the round trip check encodes against
+
+
+def coop_policy(game):
+    return game.take_input(0)
+
+
+def make_coop_game(**kwargs):
+    import headless  # Selects the dummy drivers, so clients never import it
+
+    # Authoritative two-player game: the first player is the regular Game player, the
+    # partner shares its arrows and is moved and hit-tested around Game.update
+    class CoopGame(headless.HeadlessGame):
+        def __init__(self, **kwargs):
+            super().__init__(policy=coop_policy, **kwargs)
+            self.partner = main.Player(self.screen_width // 2 + 120, self.screen_height // 2, self.player_image(0),
+                                       self.player.arrows, self.arrow_pool.acquire)
+            self.all_sprites.add(self.partner)
+            self.players = [self.player, self.partner]
+            self.inputs = [(NO_KEYS, []), (NO_KEYS, [])]
+
+        def take_input(self, index):
+            keys, shots = self.inputs[index]
+            self.inputs[index] = (keys, [])
+            return keys, shots
+
+        def update(self):
+            partner = self.partner
+            keys, shots = self.take_input(1)
+            start = partner.rect.center
+            partner.update(keys, self.tick_scale)
+            moved = (partner.rect.centerx - start[0], partner.rect.centery - start[1])
+            for angle in shots:
+                partner.shoot(angle)
+            level = self.current_level
+
+            super().update()
+            if not self.running:
+                return
+            if self.current_level != level and self.current_level < len(main.PLAYER_IMAGES):
+                partner.image = self.player_image(self.current_level)
+                partner.rect = partner.image.get_rect(center=partner.rect.center)
+
+            if self.swept_collision:
+                hit = swept_spritecollide(partner.rect.center, moved, self.balls,
+                                          main.PLAYER_RADIUS + main.BALL_RADIUS, self.tick_scale, True)
+            else:
+                hit = pygame.sprite.spritecollide(partner, self.balls, True)
+            if hit:
+                partner.reduce_hp()
+                if partner.hp <= 0:
+                    self.display_lose_message()
+                    return
+            if pygame.sprite.spritecollide(partner, self.soybeans, True):
+                partner.increase_hp()
+
+    return CoopGame(**kwargs)
+
+
+# One connected client as seen by the server
+class ClientLink:
+    def __init__(self, index, writer):
+        self.index = index
+        self.writer = writer
+        self.ack = None  # Newest snapshot tick the client confirmed
+        self.mask = 0
+        self.shots = []
+        self.connected = True
+        self.bytes = 0
+        self.max_bytes = 0
+        self.frames = 0
+
+
+# Runs the game at its tick rate and streams delta snapshots to every client
+class CoopServer:
+    def __init__(self, game, players=2, host=HOST, port=PORT):
+        self.game = game
+        self.players = players
+        self.host = host
+        self.port = port
+        self.links = []
+        self.ready = asyncio.Event()
+        self.ids = {kind: netsync.EntityIds() for kind, _ in netsync.ENTITY_KINDS}
+        self.history = {}  # tick -> state, baselines for the clients' acks
+        self.encode_ns = 0
+        self.encoded_entities = 0
+        self.full_sizes = []  # Sampled sizes of snapshots without a baseline
+        self.verify = False  # Decode every sent snapshot and compare it with the captured state
+        self.mismatches = []  # Ticks whose snapshot did not decode to the captured state
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.connected, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def connected(self, reader, writer):
+        if len(self.links) >= self.players:
+            writer.close()
+            return
+        link = ClientLink(len(self.links), writer)
+        self.links.append(link)
+        writer.write(FRAME.pack(WELCOME.size) + WELCOME.pack(link.index, self.game.tick_rate))
+        if len(self.links) == self.players:
+            self.ready.set()
+        try:
+            while True:
+                size = FRAME.unpack(await reader.readexactly(FRAME.size))[0]
+                data = await reader.readexactly(size)
+                ack, link.mask, count = INPUT.unpack_from(data)
+                link.ack = ack
+                angles = array("f")
+                angles.frombytes(data[INPUT.size:INPUT.size + 4 * count])
+                link.shots.extend(angles)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            link.connected = False
+
+    def broadcast(self, tick, outcome):
+        state = netsync.capture(self.game, self.ids, tick, outcome)
+        self.history[tick] = state
+        self.history.pop(tick - HISTORY, None)
+        entities = len(state["balls"]) + len(state["arrows"]) + len(state["soybeans"])
+        for link in self.links:
+            if not link.connected:
+                continue
+            started = time.perf_counter_ns()
+            data = netsync.encode(state, self.history.get(link.ack))
+            self.encode_ns += time.perf_counter_ns() - started
+            self.encoded_entities += entities
+            if self.verify and netsync.decode(data, self.history) != state:
+                self.mismatches.append(tick)
+            link.writer.write(FRAME.pack(len(data)) + data)
+            link.bytes += len(data)
+            link.max_bytes = max(link.max_bytes, len(data))
+            link.frames += 1
+        if tick % FULL_SIZE_EVERY == 0:
+            self.full_sizes.append(len(netsync.encode(state)))
+
+    async def run(self, duration_ms=None):
+        await self.ready.wait()
+        game = self.game
+        tick_seconds = 1 / game.tick_rate
+        next_tick = time.perf_counter()
+        while game.running and (duration_ms is None or game.get_ticks() < duration_ms):
+            # Latest held keys and all shots since the previous tick, per player
+            game.inputs = [(PressedKeys(mask_keys(link.mask)), link.shots) for link in self.links]
+            for link in self.links:
+                link.shots = []
+            game.step()
+            outcome = {"win": netsync.OUTCOME_WIN, "lose": netsync.OUTCOME_LOSE}.get(game.outcome, netsync.OUTCOME_NONE)
+            self.broadcast(game.tick, outcome)
+
+            next_tick += tick_seconds
+            delay = next_tick - time.perf_counter()
+            if delay < 0:
+                next_tick = time.perf_counter()
+                delay = 0
+            await asyncio.sleep(delay)
+        for link in self.links:
+            link.writer.close()
+        self.server.close()
+
+    def stats(self):
+        frames = sum(link.frames for link in self.links) or 1
+        sent = sum(link.bytes for link in self.links)
+        return {
+            "bytes_per_tick": sent / frames,
+            "max_bytes_per_tick": max((link.max_bytes for link in self.links), default=0),
+            "kbit_per_second": sent / frames * self.game.tick_rate * 8 / 1000,
+            "full_snapshot_bytes": sum(self.full_sizes) / len(self.full_sizes) if self.full_sizes else 0,
+            "encode_ns_per_entity": self.encode_ns / max(self.encoded_entities, 1),
+        }
+
+
+# Receives snapshots, keeps the delta baselines and interpolates between the newest two
+class SnapshotClient:
+    def __init__(self):
+        self.states = {}  # tick -> decoded state
+        self.buffer = deque(maxlen=8)  # Recent states in arrival order
+        self.clock_offset = None  # Server game time minus local milliseconds
+        self.index = None
+        self.tick_rate = main.BASE_TICK_RATE
+        self.ack = netsync.NO_BASELINE
+        self.decode_ns = 0
+        self.decoded_entities = 0
+        self.done = False
+
+    async def connect(self, host=HOST, port=PORT):
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+        size = FRAME.unpack(await self.reader.readexactly(FRAME.size))[0]
+        self.index, self.tick_rate = WELCOME.unpack(await self.reader.readexactly(size))
+
+    async def receive(self):
+        try:
+            while True:
+                size = FRAME.unpack(await self.reader.readexactly(FRAME.size))[0]
+                data = await self.reader.readexactly(size)
+                started = time.perf_counter_ns()
+                state = netsync.decode(data, self.states)
+                self.decode_ns += time.perf_counter_ns() - started
+                self.decoded_entities += len(state["balls"]) + len(state["arrows"]) + len(state["soybeans"])
+                self.states[state["tick"]] = state
+                self.states.pop(state["tick"] - HISTORY, None)
+                self.buffer.append(state)
+                self.ack = state["tick"]
+                offset = state["time"] - time.perf_counter() * 1000
+                self.clock_offset = offset if self.clock_offset is None else max(offset, self.clock_offset - 1)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        self.done = True
+
+    def send_input(self, mask, shots):
+        data = INPUT.pack(self.ack, mask, len(shots)) + array("f", shots).tobytes()
+        self.writer.write(FRAME.pack(len(data)) + data)
+
+    def view(self):
+        # Interpolated view INTERPOLATION_DELAY behind the newest snapshot, None before the first
+        if not self.buffer:
+            return None
+        render_time = time.perf_counter() * 1000 + self.clock_offset - INTERPOLATION_DELAY
+        states = list(self.buffer)
+        for a, b in zip(states, states[1:]):
+            if a["time"] <= render_time <= b["time"]:
+                span = b["time"] - a["time"]
+                return netsync.interpolate(a, b, (render_time - a["time"]) / span if span else 1.0)
+        newest = states[-1] if render_time > states[-1]["time"] else states[0]
+        return netsync.interpolate(newest, newest, 1.0)
+
+
+# Windowed client: sends the local input each frame and draws the interpolated view
+class GameClient(SnapshotClient):
+    def __init__(self):
+        super().__init__()
+        pygame.display.init()
+        pygame.font.init()
+        self.screen = pygame.display.set_mode((main.SCREEN_WIDTH, main.SCREEN_HEIGHT))
+        self.font = pygame.font.Font(None, 36)
+        self.ball_image = main.assets.scaled("ball.png", main.BALL_SIZE)
+        self.soybean_image = main.assets.scaled("soybean.png", main.SOYBEAN_SIZE)
+        self.boss_image = main.assets.scaled("boss.png", main.BOSS_SIZE)
+        main.Soybean.build_aura_frames()
+
+    async def play(self):
+        receiving = asyncio.ensure_future(self.receive())
+        pygame.display.set_caption(f"SoyBoyz Adventure co-op, player {self.index + 1}")
+        running = True
+        while running and not self.done:
+            view = self.view()
+            shots = []
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                elif event.type == pygame.MOUSEBUTTONDOWN and view is not None:
+                    px, py = view["players"][self.index][:2]
+                    mx, my = event.pos
+                    shots.append(math.degrees(math.atan2(py - my, mx - px)))
+            self.send_input(key_mask(pygame.key.get_pressed()), shots)
+            if view is not None:
+                self.draw(view)
+            await asyncio.sleep(1 / 60)
+        receiving.cancel()
+        self.writer.close()
+
+    def draw(self, view):
+        screen = self.screen
+        screen.fill((0, 0, 0))
+        level = view["level"][0]
+        for x, y, spawn_time in view["soybeans"]:
+            elapsed = view["time"] - spawn_time
+            frame = int(elapsed % main.AURA_PERIOD * main.AURA_FRAME_COUNT / main.AURA_PERIOD)
+            screen.blit(main.Soybean.aura_frames[frame], (x - main.AURA_RADIUS, y - main.AURA_RADIUS))
+            screen.blit(self.soybean_image, self.soybean_image.get_rect(center=(x, y)))
+        for x, y in view["balls"]:
+            screen.blit(self.ball_image, self.ball_image.get_rect(center=(x, y)))
+        for x, y, angle in view["arrows"]:
+            image = main.assets.arrow_frame(angle * 360 / 256)
+            screen.blit(image, image.get_rect(center=(x, y)))
+        image = main.assets.scaled(main.PLAYER_IMAGES[min(level, len(main.PLAYER_IMAGES) - 1)], main.PLAYER_SIZE)
+        for x, y, hp in view["players"]:
+            screen.blit(image, image.get_rect(center=(x, y)))
+        if view["boss"] is not None:
+            x, y, health = view["boss"]
+            screen.blit(self.boss_image, self.boss_image.get_rect(center=(x, y)))
+            pygame.draw.rect(screen, (255, 0, 0), (main.SCREEN_WIDTH // 2 - 100, 50, 200, 20))
+            pygame.draw.rect(screen, (0, 255, 0), (main.SCREEN_WIDTH // 2 - 100, 50, 2 * health, 20))
+
+        current, count, destroyed, needed = view["level"]
+        hp = "  ".join(f"P{i + 1} HP: {player[2]}" for i, player in enumerate(view["players"]))
+        for y, line in ((10, f"Level: {current + 1}/{count}  Balls Destroyed: {destroyed}/{needed}"), (40, hp)):
+            screen.blit(self.font.render(line, True, (255, 255, 255)), (10, y))
+        if view["outcome"]:
+            message = "You Won!" if view["outcome"] == netsync.OUTCOME_WIN else "You Lose"
+            text = self.font.render(message, True, (255, 255, 255))
+            screen.blit(text, text.get_rect(center=(main.SCREEN_WIDTH // 2, main.SCREEN_HEIGHT // 2)))
+        pygame.display.flip()
+
+
+# Display-free client for measurements: random movement and shots, interpolates every frame
+class BotClient(SnapshotClient):
+    def __init__(self, seed):
+        super().__init__()
+        self.rng = random.Random(seed)
+        self.mask = 0
+        self.views = 0
+
+    async def play(self):
+        receiving = asyncio.ensure_future(self.receive())
+        while not self.done:
+            self.mask, shots = bot_input(self.rng, self.mask)
+            self.send_input(self.mask, shots)
+            if self.view() is not None:
+                self.views += 1
+            await asyncio.sleep(1 / 60)
+        await receiving
+
+
+def bot_input(rng, mask):
+    # Random held keys that change now and then, and an occasional shot
+    if rng.random() < 0.05:
+        mask = rng.getrandbits(8)
+    return mask, [rng.uniform(-180, 180)] if rng.random() < 0.2 else []
+
+
+def round_trip_mismatches(states, lags=CHECK_LAGS):
+    # (tick, baseline tick) pairs of states that do not decode back to themselves, as full
+    # snapshots and as deltas against each earlier state lags ticks back
+    by_tick = {state["tick"]: state for state in states}
+    mismatches = []
+    for state in states:
+        tick = state["tick"]
+        if netsync.decode(netsync.encode(state), {}) != state:
+            mismatches.append((tick, None))
+        for lag in lags:
+            baseline = by_tick.get(tick - lag)
+            if baseline is not None and netsync.decode(netsync.encode(state, baseline), by_tick) != state:
+                mismatches.append((tick, baseline["tick"]))
+    return mismatches
+
+
+def check(args):
+    # Captures a bot-driven session without sockets and round trips every snapshot through the codec
+    game = make_coop_game(seed=args.seed, tick_rate=args.tick_rate)
+    game.spawn_interval = args.spawn_interval
+    for player in game.players:
+        player.hp = 10 ** 6
+    ids = {kind: netsync.EntityIds() for kind, _ in netsync.ENTITY_KINDS}
+    rng = random.Random(args.seed)
+    masks = [0, 0]
+    states = []
+    while game.running and len(states) < args.ticks:
+        inputs = []
+        for i, mask in enumerate(masks):
+            masks[i], shots = bot_input(rng, mask)
+            inputs.append((PressedKeys(mask_keys(masks[i])), shots))
+        game.inputs = inputs
+        game.step()
+        states.append(netsync.capture(game, ids, game.tick))
+    mismatches = round_trip_mismatches(states)
+    entities = max(len(state["balls"]) + len(state["arrows"]) + len(state["soybeans"]) for state in states)
+    if mismatches:
+        print(f"{len(mismatches)} snapshots decode to a different state, (tick, baseline) {mismatches[:10]}")
+        return False
+    print(f"{len(states)} snapshots (up to {entities} entities) decode to the captured state, "
+          f"full and against baselines {', '.join(map(str, CHECK_LAGS))} ticks back")
+    return True
+
+
+async def serve(args):
+    game = make_coop_game(seed=args.seed, tick_rate=args.tick_rate)
+    server = CoopServer(game, port=args.port)
+    await server.start()
+    print(f"Co-op server on {HOST}:{server.port}, waiting for 2 players")
+    await server.run()
+    print_stats(server, [])
+
+
+async def bench(args):
+    # Server and two bot clients on one loopback connection each, in this process
+    game = make_coop_game(seed=args.seed, tick_rate=args.tick_rate)
+    game.spawn_interval = args.spawn_interval
+    for player in game.players:
+        player.hp = 10 ** 6  # Keep the session going for the whole measurement
+        player.increase_hp = lambda: None
+    server = CoopServer(game, port=0)
+    server.verify = True
+    await server.start()
+    clients = [BotClient(seed) for seed in range(2)]
+    for client in clients:
+        await client.connect(port=server.port)
+    peak = 0
+
+    async def watch():
+        nonlocal peak
+        while game.running and game.get_ticks() < args.seconds * 1000:
+            peak = max(peak, len(game.balls))
+            await asyncio.sleep(0.1)
+
+    await asyncio.gather(server.run(args.seconds * 1000), watch(), *(client.play() for client in clients))
+    print(f"Peak live balls {peak}")
+    print_stats(server, clients)
+    if server.mismatches:
+        print(f"Snapshots for ticks {server.mismatches[:10]} did not decode to the captured state")
+        return False
+    print(f"All {sum(link.frames for link in server.links)} snapshots decoded to the captured state")
+    return True
+
+
+def print_stats(server, clients):
+    stats = server.stats()
+    print(f"Snapshot bytes per tick {stats['bytes_per_tick']:.0f} (max {stats['max_bytes_per_tick']}, "
+          f"uncompressed {stats['full_snapshot_bytes']:.0f}), {stats['kbit_per_second']:.0f} kbit/s per client")
+    print(f"Encode {stats['encode_ns_per_entity']:.0f} ns per entity")
+    for client in clients:
+        print(f"Client {client.index + 1}: decode {client.decode_ns / max(client.decoded_entities, 1):.0f} ns per entity, "
+              f"{len(client.states)} baselines held, {client.views} interpolated views")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Two-player SoyBoyz Adventure over a local socket")
+    commands = parser.add_subparsers(dest="command", required=True)
+    server_parser = commands.add_parser("server", help="run the authoritative game")
+    server_parser.add_argument("--port", type=int, default=PORT)
+    server_parser.add_argument("--seed", type=int, default=0)
+    server_parser.add_argument("--tick-rate", type=main.tick_rate_arg, default=main.BASE_TICK_RATE)
+    client_parser = commands.add_parser("client", help="join a server with a window")
+    client_parser.add_argument("--host", default=HOST)
+    client_parser.add_argument("--port", type=int, default=PORT)
+    bench_parser = commands.add_parser("bench", help="measure bandwidth and serialisation cost with bot clients")
+    bench_parser.add_argument("--seconds", type=float, default=10)
+    bench_parser.add_argument("--spawn-interval", type=int, default=10, help="milliseconds between ball spawns")
+    bench_parser.add_argument("--seed", type=int, default=0)
+    bench_parser.add_argument("--tick-rate", type=main.tick_rate_arg, default=main.BASE_TICK_RATE)
+    check_parser = commands.add_parser("check", help="check that snapshots decode back to the captured state")
+    check_parser.add_argument("--ticks", type=int, default=600)
+    check_parser.add_argument("--spawn-interval", type=int, default=10, help="milliseconds between ball spawns")
+    check_parser.add_argument("--seed", type=int, default=0)
+    check_parser.add_argument("--tick-rate", type=main.tick_rate_arg, default=main.BASE_TICK_RATE)
+    args = parser.parse_args()
+
+    if args.command == "server":
+        asyncio.run(serve(args))
+    elif args.command == "client":
+        client = GameClient()
+
+        async def join():
+            await client.connect(args.host, args.port)
+            await client.play()
+
+        asyncio.run(join())
+    elif args.command == "check":
+        passed = check(args)
+        pygame.quit()
+        sys.exit(0 if passed else 1)
+    else:
+        passed = asyncio.run(bench(args))
+        pygame.quit()
+        sys.exit(0 if passed else 1)
+    pygame.quit()
@@ -0,0 +1,71 @@
+FRAME_BUDGET_MS = 1000 / 60  # Work allowed per frame at the 60 FPS target
+GOVERNOR_WINDOW = 30  # Frames averaged before each decision
+RECOVER_FRACTION = 0.5  # Step back down once a frame costs less than this share of the budget
+BALL_CAP = 80  # Live balls allowed while the cap is active
+HUD_BATCH = 10  # Frames between HUD refreshes while batching
+
+# Degradation steps, each level keeps the ones below it
+STEPS = (
+    "full quality",
+    "no soybean auras",
+    f"live balls capped at {BALL_CAP}",
+    f"HUD refreshed every {HUD_BATCH} frames",
+    "rendering every other frame",
+)
+
+
+# Frame-budget governor: averages the measured update and draw time over a window of
+# frames and sheds or restores one step at a time. The simulation always runs every
+# frame; only the ball cap changes what it does, so recordings log the level changes
+class LoadGovernor:
+    def __init__(self, budget_ms=FRAME_BUDGET_MS, window=GOVERNOR_WINDOW, log=print):
+        self.budget_ns = budget_ms * 1e6
+        self.window = window
+        self.log = log
+        self.level = 0
+        self.frame = 0
+        self.window_frames = 0
+        self.window_ns = 0
+        self.transitions = []  # (game time, old level, new level, mean frame ms)
+
+    @property
+    def auras(self):
+        return self.level < 1
+
+    @property
+    def max_balls(self):
+        return BALL_CAP if self.level >= 2 else None
+
+    def hud_due(self):
+        return self.level < 3 or self.frame % HUD_BATCH == 0
+
+    def render_due(self):
+        return self.level < 4 or self.frame % 2 == 0
+
+    def set_level(self, level, now, mean_ms=0.0):
+        if level == self.level:
+            return
+        self.transitions.append((now, self.level, level, round(mean_ms, 3)))
+        if self.log is not None:
+            self.log(f"Load shedding level {self.level} -> {level} at {now} ms "
+                     f"({mean_ms:.1f} ms/frame): {STEPS[level]}")
+        self.level = level
+
+    def end_frame(self, work_ns, now):
+        # Returns the new level when this frame closed a window that changed it, else None
+        self.frame += 1
+        self.window_frames += 1
+        self.window_ns += work_ns
+        if self.window_frames < self.window:
+            return None
+        mean_ns = self.window_ns / self.window_frames
+        self.window_frames = 0
+        self.window_ns = 0
+        if mean_ns > self.budget_ns and self.level < len(STEPS) - 1:
+            level = self.level + 1
+        elif mean_ns < self.budget_ns * RECOVER_FRACTION and self.level > 0:
+            level = self.level - 1
+        else:
+            return None
+        self.set_level(level, now, mean_ns / 1e6)
+        return level
@@ -0,0 +1,104 @@
+import pygame
+from pygame._sdl2.video import Window, Renderer, Texture
+from assets import assets, ARROW_SIZE
+
+BLEND = 1  # SDL_BLENDMODE_BLEND, needed for alpha modulation to apply
+
+
+# Render backend on SDL2's Renderer: every image is uploaded to a texture once and
+# rotation and alpha are applied by the renderer at draw time. accelerated=-1 lets SDL
+# fall back to its software renderer on machines without a GPU
+class GpuRenderer:
+    def __init__(self, width, height, title, vsync=False):
+        self.window = Window(title, (width, height))
+        self.renderer = Renderer(self.window, accelerated=-1, vsync=vsync)
+        self.textures = {}  # Source surface -> texture
+        self.aura = None
+        self.screen_texture = None  # Upload of the software screen used by the menus
+        self.hud_panels = (None, None)  # HUD surfaces the HUD textures were made from
+        self.hud_textures = ()
+        self.overlay = pygame.Surface((width, height), pygame.SRCALPHA)
+
+    def texture(self, surface):
+        # Textures are keyed by the surface object; sprite images are shared cache entries
+        texture = self.textures.get(surface)
+        if texture is None:
+            texture = Texture.from_surface(self.renderer, surface)
+            texture.blend_mode = BLEND
+            self.textures[surface] = texture
+        return texture
+
+    def present_surface(self, surface):
+        # Shows a frame drawn in software, as the menu and end screens are
+        if self.screen_texture is None:
+            self.screen_texture = Texture(self.renderer, surface.get_size(), streaming=True)
+        self.screen_texture.update(surface)
+        self.renderer.blit(self.screen_texture)
+        self.renderer.present()
+
+    def aura_texture(self, radius):
+        # Full-strength aura circle; the pulse is applied as alpha modulation per soybean
+        if self.aura is None:
+            surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+            pygame.draw.circle(surface, (0, 255, 0, 255), (radius, radius), radius)
+            self.aura = self.texture(surface)
+        return self.aura
+
+    def draw(self, game):
+        renderer = self.renderer
+        renderer.draw_color = (0, 0, 0, 255)
+        renderer.clear()
+
+        now = game.get_ticks()
+        for soybean in game.soybeans if game.governor.auras else ():
+            radius = soybean.aura_frames[0].get_width() // 2
+            aura = self.aura_texture(radius)
+            aura.alpha = soybean.aura_alphas[soybean.aura_frame(now)]
+            x, y = soybean.rect.center
+            aura.draw(dstrect=(x - radius, y - radius, 2 * radius, 2 * radius))
+
+        if game.use_projectile_engine:
+            game.balls.sync()
+            game.player.arrows.sync()
+
+        for sprite in game.all_sprites:
+            self.texture(sprite.image).draw(dstrect=sprite.rect)
+
+        # Arrows use the unrotated image, turned by the renderer
+        if game.player.arrows:
+            arrow = self.texture(assets.image("arrow.png"))
+            for sprite in game.player.arrows:
+                rect = pygame.Rect((0, 0), ARROW_SIZE)
+                rect.center = sprite.rect.center
+                arrow.draw(dstrect=rect, angle=sprite.angle)
+
+        pointer = game.get_pointer()
+        if pointer is not None:
+            self.texture(pointer[0]).draw(dstrect=pointer[1])
+        game.profiler.lap("draw.sprites")
+
+        # HUD panels are re-uploaded only when the HUD rebuilt them
+        hud = game.hud
+        if game.governor.hud_due() or hud.panel is None:
+            hud.update(game)
+        if (hud.panel, hud.boss_panel) != self.hud_panels:
+            self.hud_panels = (hud.panel, hud.boss_panel)
+            self.hud_textures = [self.texture_for_frame(panel) for panel in self.hud_panels if panel is not None]
+        for texture, rect in zip(self.hud_textures, hud.rects()):
+            texture.draw(dstrect=rect)
+
+        if game.show_profiler:
+            self.overlay.fill((0, 0, 0, 0))
+            rects = game.profiler.draw_overlay(self.overlay, game.debug_font)
+            area = rects[0].unionall(rects[1:])
+            self.texture_for_frame(self.overlay.subsurface(area)).draw(dstrect=area)
+        game.profiler.lap("draw.hud")
+
+        renderer.present()
+        game.profiler.lap("flip")
+
+    def texture_for_frame(self, surface):
+        # Uncached upload for surfaces that change, like the HUD panels
+        texture = Texture.from_surface(self.renderer, surface)
+        texture.blend_mode = BLEND
+        return texture
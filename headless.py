@@ -0,0 +1,123 @@
+import os
+
+# Select the SDL dummy drivers before pygame is initialised by main
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import math
+import random
+import time
+import pygame
+import main
+from projectiles import np
+from sim import SimClock, PressedKeys, NO_KEYS
+
+
+
+# Bot policies take the game and return (pressed keys, list of shot angles) for a tick
+def idle_policy(game):
+    return NO_KEYS, []
+
+
+def aim_policy(game, fire_every=8):
+    # Shoot at the closest ball every few ticks, standing still
+    if game.tick % fire_every or not game.balls:
+        return NO_KEYS, []
+    if game.use_projectile_engine:
+        game.balls.sync()  # Engine rects only follow the float positions when synced
+    px, py = game.player.rect.center
+    ball = min(game.balls, key=lambda b: (b.rect.centerx - px) ** 2 + (b.rect.centery - py) ** 2)
+    angle = math.degrees(math.atan2(py - ball.rect.centery, ball.rect.centerx - px))
+    return NO_KEYS, [angle]
+
+
+MOVE_KEYS = [pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN]
+
+
+class RandomPolicy:
+    # Wanders with random keys and fires in random directions, from its own seeded RNG
+    def __init__(self, seed=0, fire_chance=0.1, turn_chance=0.05):
+        self.rng = random.Random(seed)
+        self.fire_chance = fire_chance
+        self.turn_chance = turn_chance
+        self.keys = NO_KEYS
+
+    def __call__(self, game):
+        if self.rng.random() < self.turn_chance:
+            self.keys = PressedKeys(self.rng.sample(MOVE_KEYS, self.rng.randint(0, 2)))
+        shots = [self.rng.uniform(-180, 180)] if self.rng.random() < self.fire_chance else []
+        return self.keys, shots
+
+
+# Game running on a fixed simulated timestep with no rendering and no wall-clock waits
+class HeadlessGame(main.Game):
+    def __init__(self, seed=0, timestep=None, policy=idle_policy, **kwargs):
+        self.sim_clock = SimClock()
+        super().__init__(clock=self.sim_clock, seed=seed, **kwargs)
+        self.timestep = 1000 / self.tick_rate if timestep is None else timestep  # Game milliseconds per tick
+        self.policy = policy
+        self.tick = 0
+        self.outcome = None
+        self.keys = NO_KEYS
+
+    def get_keys(self):
+        return self.keys
+
+    def display_lose_message(self):
+        self.outcome = "lose"
+        self.running = False
+
+    def display_win_message(self):
+        self.outcome = "win"
+        self.running = False
+
+    def step(self):
+        self.tick += 1
+        self.profiler.begin_frame()
+        self.sim_clock.advance(self.timestep)
+        self.tick_clock()
+        self.keys, shots = self.policy(self)
+        for angle in shots:
+            self.player.shoot(angle)
+        self.profiler.lap("events")
+        self.update()
+        self.profiler.end_frame(len(self.balls), len(self.player.arrows), len(self.soybeans))
+
+    def simulate(self, duration_ms):
+        # Run as fast as the CPU allows until the session ends or the time is up
+        end = self.sim_clock.time + duration_ms
+        while self.running and self.sim_clock.time < end:
+            self.step()
+        return self.outcome
+
+
+POLICIES = {"idle": idle_policy, "aim": aim_policy, "random": RandomPolicy}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run SoyBoyz Adventure without a display")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--minutes", type=float, default=10)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="aim")
+    parser.add_argument("--tick-rate", type=main.tick_rate_arg, default=main.BASE_TICK_RATE,
+                        help="simulation ticks per second; below 60 uses swept collision")
+    parser.add_argument("--swept", action="store_true", help="use swept collision at any tick rate")
+    parser.add_argument("--engine", action="store_true", help="move balls and arrows with the NumPy projectile engine")
+    args = parser.parse_args()
+    if args.engine and np is None:
+        parser.error("--engine needs numpy installed")
+
+    policy = POLICIES[args.policy]
+    if policy is RandomPolicy:
+        policy = RandomPolicy(args.seed)
+    game = HeadlessGame(seed=args.seed, policy=policy, tick_rate=args.tick_rate, swept_collision=args.swept,
+                        use_projectile_engine=args.engine)
+    started = time.perf_counter()
+    outcome = game.simulate(args.minutes * 60000)
+    elapsed = time.perf_counter() - started
+    print(f"Outcome: {outcome or 'timeout'} after {game.sim_clock() / 1000:.1f}s of game time "
+          f"({game.tick} ticks in {elapsed:.2f}s, {game.tick / elapsed:.0f} ticks/s)")
+    for name, stats in game.pool_stats().items():
+        print(f"{name} pool: high water {stats['high_water']}, created {stats['created']}")
+    pygame.quit()
@@ -0,0 +1,103 @@
+from collections import OrderedDict
+import pygame
+
+TEXT_CACHE_SIZE = 128  # Rendered strings kept before the least recently used is dropped
+WHITE = (255, 255, 255)
+
+
+# LRU cache of rendered text surfaces keyed by (font, string, colour)
+class TextCache:
+    def __init__(self, maxsize=TEXT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.surfaces = OrderedDict()
+
+    def render(self, font, text, colour):
+        key = (font, text, colour)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            return surface
+        surface = font.render(text, True, colour)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.maxsize:
+            self.surfaces.popitem(last=False)
+        return surface
+
+
+# HUD panels composited off-screen and rebuilt only when the values they show change
+class Hud:
+    def __init__(self, font, text_cache, screen_width):
+        self.font = font
+        self.text_cache = text_cache
+        self.screen_width = screen_width
+        self.panel = None
+        self.panel_key = None
+        self.boss_panel = None  # Only set while the boss is alive
+        self.boss_key = None
+
+    def build_panel(self, game):
+        render = self.text_cache.render
+        texts = [
+            render(self.font, f"Level: {game.current_level + 1}/{len(game.levels)}", WHITE),
+            render(self.font, f"Balls Destroyed: {game.balls_destroyed}/{game.total_balls_needed}", WHITE),
+            render(self.font, f"HP: {game.player.hp}", WHITE),
+        ]
+        width = max([210] + [10 + text.get_width() for text in texts])
+        height = 130 + texts[-1].get_height()
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+
+        # HP bar and progress bar
+        pygame.draw.rect(panel, (255, 0, 0), (10, 10, 200, 20))  # Red background
+        pygame.draw.rect(panel, (0, 255, 0), (10, 10, 20 * game.player.hp, 20))  # Green HP
+        pygame.draw.rect(panel, (255, 255, 0), (10, 40, game.progress_bar_length, 20))  # Yellow progress
+
+        # Level, balls destroyed and HP labels
+        for y, text in zip((70, 100, 130), texts):
+            panel.blit(text, (10, y))
+        return panel
+
+    def build_boss_panel(self, health):
+        text = self.text_cache.render(self.font, "Boss Health", WHITE)
+        width = max(200, text.get_width())
+        panel = pygame.Surface((width, 50), pygame.SRCALPHA)
+        panel.blit(text, (width // 2 - text.get_width() // 2, 0))
+        pygame.draw.rect(panel, (255, 0, 0), (width // 2 - 100, 30, 200, 20))
+        pygame.draw.rect(panel, (0, 255, 0), (width // 2 - 100, 30, 2 * health, 20))
+        return panel
+
+    def update(self, game):
+        # Rebuild the panels whose values changed, returns True if anything changed
+        changed = False
+        key = (game.player.hp, game.balls_destroyed, game.total_balls_needed,
+               game.current_level, game.progress_bar_length)
+        if key != self.panel_key:
+            self.panel = self.build_panel(game)
+            self.panel_key = key
+            changed = True
+
+        # Boss health bar while the boss is alive
+        boss = getattr(game, 'boss', None)
+        boss_key = boss.health if boss is not None and boss.alive() else None
+        if boss_key != self.boss_key:
+            self.boss_panel = None if boss_key is None else self.build_boss_panel(boss_key)
+            self.boss_key = boss_key
+            changed = True
+        return changed
+
+    def rects(self):
+        # Screen rects covered by the panels
+        rects = [self.panel.get_rect()]
+        if self.boss_panel is not None:
+            rects.append(self.boss_panel.get_rect(midtop=(self.screen_width // 2, 20)))
+        return rects
+
+    def blit(self, surface):
+        rects = self.rects()
+        surface.blit(self.panel, rects[0])
+        if self.boss_panel is not None:
+            surface.blit(self.boss_panel, rects[1])
+        return rects
+
+    def draw(self, surface, game):
+        self.update(game)
+        return self.blit(surface)
@@ -1,10 +1,40 @@
+import time
+
+STARTUP_TIME = time.perf_counter()  # Reference point for the time-to-first-frame metric
+
 import pygame
 import sys
+import argparse
 import math
 import random
 import asyncio
+from assets import assets
+from spatial import SpatialHash, spritecollide, groupcollide
+from sweep import swept_spritecollide, swept_groupcollide
+from projectiles import ProjectileGroup, np
+from profiler import FrameProfiler
+from hud import Hud, TextCache
+from render import DirtyRenderer
+from pools import SpritePool
+from scenes import SceneManager, MenuScene, EndScene
+from recording import InputRecorder, MAX_TICK_RATE
+from spawner import SpawnScheduler, WAVE_PATTERNS, wave_spawns
+from governor import LoadGovernor
+
+
+def get_ticks():
+    # Milliseconds since startup. SDL's timer only runs after pygame.init(), which also opens
+    # the audio device, so the game clock does not depend on it
+    return int((time.perf_counter() - STARTUP_TIME) * 1000)
+
+
+def tick_rate_arg(text):
+    # argparse type for --tick-rate
+    rate = int(text)
+    if not 1 <= rate <= MAX_TICK_RATE:
+        raise argparse.ArgumentTypeError(f"tick rate must be between 1 and {MAX_TICK_RATE}")
+    return rate
 
-pygame.init()
 
 # Constants
 SCREEN_WIDTH = 1000
@@ -12,25 +42,55 @@ SCREEN_HEIGHT = 800
 INITIAL_BALL_SPAWN_INTERVAL = 700  # Initial milliseconds between ball spawns, reduced by 30%
 SOYBEAN_SPAWN_INTERVAL = 5000  # Milliseconds between soybean spawns
 SOYBEAN_LIFETIME = 3000  # Milliseconds before a soybean disappears
-
-# Define custom events for spawning balls and soybeans
-SPAWN_BALL_EVENT = pygame.USEREVENT + 1
-SPAWN_SOYBEAN_EVENT = pygame.USEREVENT + 2
-
-# Set timers for ball and soybean spawns
-pygame.time.set_timer(SPAWN_BALL_EVENT, INITIAL_BALL_SPAWN_INTERVAL)
-pygame.time.set_timer(SPAWN_SOYBEAN_EVENT, SOYBEAN_SPAWN_INTERVAL)
-
-# Initialize Pygame's mixer for MIDI music
-pygame.mixer.init()
+SPAWN_INTERVAL_DECAY = 0.7  # Ball spawn interval multiplier per level (30% faster spawns)
+BALL_SPEED_RAMP = 1.3  # Ball speed range multiplier per level
+MIN_BALL_SPEED = 2.6  # Initial ball speed range in pixels per tick, 30% faster than the original
+MAX_BALL_SPEED = 7.8
+BOSS_SHOOT_COOLDOWN = 2000  # Milliseconds between boss volleys
+BASE_TICK_RATE = 60  # Ticks per second the per-tick speeds are tuned for
+
+# Sprite sizes, images are scaled to these once by the asset cache
+PLAYER_SIZE = (100, 100)
+BALL_SIZE = (40, 40)
+SOYBEAN_SIZE = (50, 50)
+BOSS_SIZE = (200, 200)
+
+# Collision radii for swept collision, which treats every sprite as a circle
+ARROW_RADIUS = 10
+BALL_RADIUS = BALL_SIZE[0] // 2
+PLAYER_RADIUS = PLAYER_SIZE[0] // 2
+BOSS_RADIUS = BOSS_SIZE[0] // 2
+
+# Per-level images; only the current and next level are loaded while playing
+PLAYER_IMAGES = ["player_level1.png", "player_level2.png", "player_level3.png", "player_level4.png"]
+POINTER_IMAGES = [("pointer1.png", (50, 50)), ("pointer2.png", (30, 70)), ("pointer3.png", (70, 30)), ("pointer4.png", (60, 60))]
+SHARED_IMAGES = ["ball.png", "soybean.png", "arrow.png", PLAYER_IMAGES[0], POINTER_IMAGES[0][0]]
+
+# Soybean aura pulse, drawn from a table of precomputed frames
+AURA_RADIUS = 40
+AURA_FRAME_COUNT = 64
+AURA_PERIOD = 2 * math.pi / 0.005  # Milliseconds per pulse of the aura alpha
+
+# Spawn schedule payloads: (kind, argument)
+SPAWN_BALL = 1  # Argument is None for a random edge ball, else (x, y, target_x, target_y)
+SPAWN_SOYBEAN = 2
+SPAWN_WAVE = 3  # Argument is a WAVE_PATTERNS name
+
+# Waves on top of the steady ball stream, off by default: a list per level of
+# (WAVE_PATTERNS name, milliseconds between waves), e.g. [[], [("burst", 9000)]];
+# the last list also covers any later levels
+LEVEL_WAVES = []
+BOSS_WAVES = []
 
 # Arrow class to handle shooting in a specified direction
 class Arrow(pygame.sprite.Sprite):
     def __init__(self, x, y, angle):
         super().__init__()
-        self.image = pygame.image.load("assets/arrow.png").convert_alpha()  # Load arrow PNG image
-        self.image = pygame.transform.rotate(self.image, -angle)  # Rotate the image based on the angle
-        self.image = pygame.transform.scale(self.image, (20, 20))  # Scale the image if necessary
+        self.reset(x, y, angle)
+
+    def reset(self, x, y, angle):
+        self.angle = angle
+        self.image = assets.arrow_frame(angle)  # Pre-rotated and scaled frame closest to the angle
         self.rect = self.image.get_rect(center=(x, y))
         self.speed = 10
 
@@ -39,9 +99,10 @@ class Arrow(pygame.sprite.Sprite):
         self.dx = math.cos(rad_angle) * self.speed
         self.dy = -math.sin(rad_angle) * self.speed  # Negative because pygame's y-axis increases downwards
 
-    def update(self):
-        self.rect.x += self.dx
-        self.rect.y += self.dy
+    def update(self, scale=1.0):
+        # scale is the number of base ticks this tick stands for
+        self.rect.x += self.dx * scale
+        self.rect.y += self.dy * scale
 
         # Remove the arrow if it goes off the screen
         if (self.rect.bottom < 0 or self.rect.top > SCREEN_HEIGHT or
@@ -50,30 +111,32 @@ class Arrow(pygame.sprite.Sprite):
 
 # Player class to handle movement, shooting, and health
 class Player(pygame.sprite.Sprite):
-    def __init__(self, x, y, image):
+    def __init__(self, x, y, image, arrows=None, arrow_factory=Arrow):
         super().__init__()
-        self.image = pygame.transform.scale(image, (100, 100))  # Scale the image if necessary
+        self.image = image  # Already scaled to PLAYER_SIZE by the asset cache
         self.rect = self.image.get_rect(center=(x, y))
         self.speed = 5
-        self.arrows = pygame.sprite.Group()  # Group to hold arrows
+        self.arrows = arrows if arrows is not None else pygame.sprite.Group()  # Group to hold arrows
         self.hp = 7  # Reduced player health to make the game harder
+        self.arrow_factory = arrow_factory
 
-    def update(self, keys):
+    def update(self, keys, scale=1.0):
         # Move the player freely
+        speed = self.speed * scale
         if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-            self.rect.x -= self.speed
+            self.rect.x -= speed
         if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-            self.rect.x += self.speed
+            self.rect.x += speed
         if keys[pygame.K_UP] or keys[pygame.K_w]:
-            self.rect.y -= self.speed
+            self.rect.y -= speed
         if keys[pygame.K_DOWN] or keys[pygame.K_s]:
-            self.rect.y += self.speed
+            self.rect.y += speed
 
         # Keep player within the screen bounds
         self.rect.clamp_ip(pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT))
 
     def shoot(self, angle):
-        arrow = Arrow(self.rect.centerx, self.rect.centery, angle)
+        arrow = self.arrow_factory(self.rect.centerx, self.rect.centery, angle)
         self.arrows.add(arrow)
 
     def reduce_hp(self):
@@ -85,11 +148,14 @@ class Player(pygame.sprite.Sprite):
 
 # Ball class to create balls moving towards the center
 class Ball(pygame.sprite.Sprite):
-    def __init__(self, x, y, target_x, target_y, image):
+    def __init__(self, x, y, target_x, target_y, image, rng=random, min_speed=MIN_BALL_SPEED, max_speed=MAX_BALL_SPEED):
         super().__init__()
-        self.image = pygame.transform.scale(image, (40, 40))  # Scale the image if necessary
+        self.reset(x, y, target_x, target_y, image, rng, min_speed, max_speed)
+
+    def reset(self, x, y, target_x, target_y, image, rng=random, min_speed=MIN_BALL_SPEED, max_speed=MAX_BALL_SPEED):
+        self.image = image  # Already scaled to BALL_SIZE by the asset cache
         self.rect = self.image.get_rect(center=(x, y))
-        self.speed = random.uniform(2.6, 7.8)  # 30% increase in initial speed range
+        self.speed = rng.uniform(min_speed, max_speed)
 
         # Calculate direction vector towards the target (center of the screen)
         dx = target_x - x
@@ -103,9 +169,9 @@ class Ball(pygame.sprite.Sprite):
             self.dx = (dx / distance) * self.speed  # Normalize and apply speed
             self.dy = (dy / distance) * self.speed
 
-    def update(self):
-        self.rect.x += self.dx
-        self.rect.y += self.dy
+    def update(self, scale=1.0):
+        self.rect.x += self.dx * scale
+        self.rect.y += self.dy * scale
 
         # Remove the ball if it moves beyond the screen boundaries
         if (self.rect.right < 0 or self.rect.left > SCREEN_WIDTH or
@@ -114,48 +180,75 @@ class Ball(pygame.sprite.Sprite):
 
 # Soybean class to handle the healing items
 class Soybean(pygame.sprite.Sprite):
-    def __init__(self, x, y):
+    def __init__(self, x, y, spawn_time=None):
         super().__init__()
-        self.image = pygame.image.load("assets/soybean.png").convert_alpha()  # Load the soybean image
-        self.image = pygame.transform.scale(self.image, (50, 50))  # Resize if necessary
-        self.rect = self.image.get_rect(center=(x, y))
-        self.spawn_time = pygame.time.get_ticks()
-
-    def draw_aura(self, surface):
-        # Calculate aura transparency based on time (pulsing effect)
-        time_elapsed = pygame.time.get_ticks() - self.spawn_time
-        alpha = 128 + 127 * math.sin(time_elapsed * 0.005)  # Alpha oscillates between 1 and 255
+        self.reset(x, y, spawn_time)
 
-        # Create an aura surface with varying transparency
-        aura_radius = 40
-        aura_color = (0, 255, 0, alpha)  # Green with varying transparency
-        aura_surface = pygame.Surface((aura_radius * 2, aura_radius * 2), pygame.SRCALPHA)
-        pygame.draw.circle(aura_surface, aura_color, (aura_radius, aura_radius), aura_radius)
-        surface.blit(aura_surface, (self.rect.centerx - aura_radius, self.rect.centery - aura_radius))
-
-    def update(self):
+    def reset(self, x, y, spawn_time=None):
+        self.image = assets.scaled("soybean.png", SOYBEAN_SIZE)  # Cached, no disk access per spawn
+        self.rect = self.image.get_rect(center=(x, y))
+        self.spawn_time = get_ticks() if spawn_time is None else spawn_time
+
+    aura_frames = None  # Shared pulse frames, built once by build_aura_frames
+    aura_alphas = None
+
+    @classmethod
+    def build_aura_frames(cls):
+        frames = []
+        alphas = []
+        for i in range(AURA_FRAME_COUNT):
+            time_elapsed = i * AURA_PERIOD / AURA_FRAME_COUNT
+            alpha = 128 + 127 * math.sin(time_elapsed * 0.005)  # Alpha oscillates between 1 and 255
+
+            # Create an aura surface with varying transparency
+            aura_color = (0, 255, 0, alpha)  # Green with varying transparency
+            aura_surface = pygame.Surface((AURA_RADIUS * 2, AURA_RADIUS * 2), pygame.SRCALPHA)
+            pygame.draw.circle(aura_surface, aura_color, (AURA_RADIUS, AURA_RADIUS), AURA_RADIUS)
+            frames.append(aura_surface)
+            alphas.append(int(alpha))
+        cls.aura_frames = frames
+        cls.aura_alphas = alphas  # Same pulse for renderers that apply alpha themselves
+
+    def aura_frame(self, now):
+        # Index of the aura frame for the time since spawning (pulsing effect)
+        time_elapsed = now - self.spawn_time
+        return int(time_elapsed % AURA_PERIOD * AURA_FRAME_COUNT / AURA_PERIOD)
+
+    def draw_aura(self, surface, now=None):
+        if now is None:
+            now = get_ticks()
+        if Soybean.aura_frames is None:
+            Soybean.build_aura_frames()
+        aura_surface = Soybean.aura_frames[self.aura_frame(now)]
+        return surface.blit(aura_surface, (self.rect.centerx - AURA_RADIUS, self.rect.centery - AURA_RADIUS))
+
+    def update(self, now=None):
         # Disappear after 3 seconds
-        if pygame.time.get_ticks() - self.spawn_time > SOYBEAN_LIFETIME:
+        if now is None:
+            now = get_ticks()
+        if now - self.spawn_time > SOYBEAN_LIFETIME:
             self.kill()
 
 class Boss(pygame.sprite.Sprite):
-    def __init__(self, x, y, image, health=100):
+    def __init__(self, x, y, image, health=100, now=None, rng=random, ball_factory=Ball, shoot_cooldown=BOSS_SHOOT_COOLDOWN):
         super().__init__()
-        self.image = pygame.transform.scale(image, (200, 200))  # Use the boss image
+        self.image = image  # Boss image, already scaled to BOSS_SIZE
         self.rect = self.image.get_rect(center=(x, y))
         self.health = health
-        self.shoot_cooldown = 2000  # Milliseconds between shots
-        self.last_shot_time = pygame.time.get_ticks()
+        self.shoot_cooldown = shoot_cooldown  # Milliseconds between shots
+        self.last_shot_time = get_ticks() if now is None else now
+        self.rng = rng
+        self.ball_factory = ball_factory
 
-    def update(self, player, balls_group, ball_image):
-        current_time = pygame.time.get_ticks()
+    def update(self, player, balls_group, ball_image, now=None):
+        current_time = get_ticks() if now is None else now
         if current_time - self.last_shot_time >= self.shoot_cooldown:
             self.shoot(player.rect.center, balls_group, ball_image)
             self.last_shot_time = current_time
 
     def shoot(self, target_pos, balls_group, ball_image):
         for _ in range(5):  # Boss shoots 5 balls at once
-            ball = Ball(self.rect.centerx, self.rect.centery, target_pos[0], target_pos[1], ball_image)
+            ball = self.ball_factory(self.rect.centerx, self.rect.centery, target_pos[0], target_pos[1], ball_image, self.rng)
             balls_group.add(ball)
 
     def reduce_health(self, amount):
@@ -163,98 +256,235 @@ class Boss(pygame.sprite.Sprite):
         if self.health <= 0:
             self.kill()
 
+# Pooled variants are recycled through a SpritePool: kill() returns them to the
+# pool's free list and acquire() calls reset() on them instead of building new ones
+# Sprite has no __slots__, so these still have an instance __dict__ for the sprite's own
+# attributes. Only the pool bookkeeping is slotted: two more dict entries would outgrow
+# the compact shared-key dict and add about 380 bytes per sprite on CPython 3.11
+class PooledArrow(Arrow):
+    __slots__ = ("pool", "in_use")
+
+    def kill(self):
+        super().kill()
+        if self.in_use:
+            self.pool.release(self)
+
+class PooledBall(Ball):
+    __slots__ = ("pool", "in_use")
+
+    def kill(self):
+        super().kill()
+        if self.in_use:
+            self.pool.release(self)
+
+class PooledSoybean(Soybean):
+    __slots__ = ("pool", "in_use")
+
+    def kill(self):
+        super().kill()
+        if self.in_use:
+            self.pool.release(self)
+
 # Game class to manage the game loop
 class Game:
-    def __init__(self, width=SCREEN_WIDTH, height=SCREEN_HEIGHT):
+    def __init__(self, width=SCREEN_WIDTH, height=SCREEN_HEIGHT, use_projectile_engine=False, clock=None, seed=None,
+                 profile_path=None, show_profiler=False, dirty_rects=False, record_path=None, lazy_assets=False,
+                 backend="surface", tick_rate=BASE_TICK_RATE, swept_collision=False):
+        # Only video and fonts are needed for the menu; audio starts with the assets
+        if not 1 <= tick_rate <= MAX_TICK_RATE:
+            raise ValueError(f"Tick rate must be between 1 and {MAX_TICK_RATE}, not {tick_rate}")
+        pygame.display.init()
+        pygame.font.init()
+
         self.screen_width = width
         self.screen_height = height
-        self.screen = pygame.display.set_mode((self.screen_width, self.screen_height))
-        pygame.display.set_caption("SoyBoyz Adventure")
+        if backend == "gpu":
+            # Menus are still drawn in software onto an off-screen surface and uploaded
+            from gpu import GpuRenderer
+            assets.convert = False  # Images become textures, there is no display format to convert to
+            self.gpu = GpuRenderer(self.screen_width, self.screen_height, "SoyBoyz Adventure")
+            self.screen = pygame.Surface((self.screen_width, self.screen_height))
+        else:
+            self.gpu = None
+            self.screen = pygame.display.set_mode((self.screen_width, self.screen_height))
+            pygame.display.set_caption("SoyBoyz Adventure")
 
-        self.clock = pygame.time.Clock()
         self.running = True
+        self.assets_ready = False
+        self.audio_ready = False
+        self.music_wanted = False
+        self.music_started = False
+        self.catch_sound = None  # Loaded with the audio
+
+        # Game time source in milliseconds and RNG, injectable for headless simulation.
+        # The time is sampled once per frame so everything in a frame sees the same value.
+        self.clock = clock if clock is not None else get_ticks
+        self.now = self.clock()
+        self.rng = random.Random(seed)
+        self.record_path = record_path  # Each game session's input is recorded here for replay.py
+        self.recorder = None
+
+        # Per-phase frame timings, dumped to profile_path (.csv or .json) on exit
+        self.profiler = FrameProfiler()
+        self.governor = LoadGovernor(budget_ms=1000 / tick_rate)  # The playing scene runs one frame per tick
+        self.profiler.metrics["load_shedding"] = self.governor.transitions
+        self.profile_path = profile_path
+        self.show_profiler = show_profiler  # Toggled in game with F3
 
         self.levels = [20, 35, 60, 100]  # Balls to destroy for each level
+        self.spawn_interval_decay = SPAWN_INTERVAL_DECAY
+        self.ball_speed_ramp = BALL_SPEED_RAMP
+        self.ramp_ball_motion = False  # The shipped game only ramps the recorded speed; balance sweeps opt in
+        self.boss_shoot_cooldown = BOSS_SHOOT_COOLDOWN
         self.current_level = 0
         self.balls_destroyed = 0
+        self.total_balls_destroyed = 0  # Across all levels of the session
         self.total_balls_needed = self.levels[self.current_level]
         self.progress_bar_length = 200
 
-        # Load player images for each level
-        self.player_images = [
-            pygame.image.load("assets/player_level1.png").convert_alpha(),
-            pygame.image.load("assets/player_level2.png").convert_alpha(),
-            pygame.image.load("assets/player_level3.png").convert_alpha(),
-            pygame.image.load("assets/player_level4.png").convert_alpha()
-        ]
-
-        # Load the ball and boss images
-        self.ball_image = pygame.image.load("assets/ball.png").convert_alpha()
-        self.boss_image = pygame.image.load("assets/boss.png").convert_alpha()  # Load boss image
-
-        # Load and scale the pointer images for each player
-        self.pointer_images = [
-            pygame.transform.scale(pygame.image.load("assets/pointer1.png").convert_alpha(), (50, 50)),
-            pygame.transform.scale(pygame.image.load("assets/pointer2.png").convert_alpha(), (30, 70)),
-            pygame.transform.scale(pygame.image.load("assets/pointer3.png").convert_alpha(), (70, 30)),
-            pygame.transform.scale(pygame.image.load("assets/pointer4.png").convert_alpha(), (60, 60))
-        ]
-
-        # Load the sound for catching soybeans
-        self.catch_sound = pygame.mixer.Sound("assets/catch_sound.mp3")  # Load sound effect
-        self.catch_sound.set_volume(0.2)
-
-        # Initialize player with the first image and corresponding pointer
-        self.player = Player(self.screen_width // 2, self.screen_height // 2, self.player_images[0])
+        # Optionally keep balls and arrows in the vectorized NumPy projectile engine
+        self.use_projectile_engine = use_projectile_engine
+
+        # Below the base tick rate every tick moves things further, which the rect tests
+        # could step over, so swept collision is always used there
+        self.tick_rate = tick_rate
+        self.tick_scale = BASE_TICK_RATE / tick_rate
+        self.swept_collision = swept_collision or tick_rate < BASE_TICK_RATE
+        bounds = (0, 0, self.screen_width, self.screen_height)
+        arrows = ProjectileGroup(bounds) if use_projectile_engine else None
+
+        # Arrows, balls and soybeans are recycled instead of reallocated on every spawn
+        self.arrow_pool = SpritePool(PooledArrow)
+        self.ball_pool = SpritePool(PooledBall)
+        self.soybean_pool = SpritePool(PooledSoybean)
+
+        # Initialize player; with lazy assets it gets its image when the assets are ready
+        player_image = pygame.Surface(PLAYER_SIZE, pygame.SRCALPHA) if lazy_assets else self.player_image(0)
+        self.player = Player(self.screen_width // 2, self.screen_height // 2, player_image, arrows,
+                             self.arrow_pool.acquire)
         self.all_sprites = pygame.sprite.Group()
         self.all_sprites.add(self.player)
 
-        self.balls = pygame.sprite.Group()
+        self.balls = ProjectileGroup(bounds) if use_projectile_engine else pygame.sprite.Group()
         self.soybeans = pygame.sprite.Group()
+        self.collision_grid = SpatialHash()  # Broadphase for swept arrow/ball collisions
 
         # Font for displaying text
         self.font = pygame.font.SysFont(None, 48)
         self.button_font = pygame.font.SysFont(None, 36)
+        self.debug_font = pygame.font.SysFont(None, 24)
+        self.text_cache = TextCache()
+        self.hud = Hud(self.font, self.text_cache, self.screen_width)
 
-        # Set the initial spawn interval and speed range
-        self.spawn_interval = INITIAL_BALL_SPAWN_INTERVAL
-        self.min_ball_speed = 2.6
-        self.max_ball_speed = 7.8
-
-    def main_menu(self):
-        while True:
-            self.screen.fill((0, 0, 0))
-
-            # Display the title
-            title_text = self.font.render("SoyBoyz Adventure", True, (255, 255, 255))
-            self.screen.blit(title_text, (self.screen_width // 2 - title_text.get_width() // 2, 150))
+        # Menu, playing and end screens run as non-blocking scenes on the asyncio loop
+        self.scenes = SceneManager(MenuScene(self))
 
-            # Create Play and Exit buttons
-            play_button = pygame.Rect(self.screen_width // 2 - 100, 300, 200, 50)
-            exit_button = pygame.Rect(self.screen_width // 2 - 100, 400, 200, 50)
+        # Dirty-rectangle rendering only redraws and presents what changed
+        self.renderer = DirtyRenderer(self.screen) if dirty_rects and self.gpu is None else None
 
-            pygame.draw.rect(self.screen, (0, 255, 0), play_button)
-            pygame.draw.rect(self.screen, (255, 0, 0), exit_button)
+        # Spawns run on the game clock, starting with the first update of a game
+        self.scheduler = SpawnScheduler()
+        self.level_waves = LEVEL_WAVES
+        self.boss_waves = BOSS_WAVES
 
-            play_text = self.button_font.render("Play", True, (0, 0, 0))
-            exit_text = self.button_font.render("Exit", True, (0, 0, 0))
-
-            self.screen.blit(play_text, (play_button.centerx - play_text.get_width() // 2, play_button.centery - play_text.get_height() // 2))
-            self.screen.blit(exit_text, (exit_button.centerx - exit_text.get_width() // 2, exit_button.centery - exit_text.get_height() // 2))
-
-            pygame.display.flip()
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == pygame.MOUSEBUTTONDOWN:
-                    if play_button.collidepoint(event.pos):
-                        self.reset_game()  # Reset the game state
-                        return  # Exit the menu and start the game
-                    elif exit_button.collidepoint(event.pos):
-                        pygame.quit()
-                        sys.exit()
+        # Set the initial spawn interval and speed range
+        self.spawn_interval = INITIAL_BALL_SPAWN_INTERVAL
+        self.min_ball_speed = MIN_BALL_SPEED
+        self.max_ball_speed = MAX_BALL_SPEED
+
+        # Without lazy assets everything is loaded up front, before the first frame
+        self.startup_metrics = self.profiler.metrics  # Included in the --profile dump
+        self.background_jobs = set()  # Loading task and decode futures, kept until they finish
+        if not lazy_assets:
+            self.load_assets()
+            if self.init_audio():
+                self.load_audio()
+            for level in range(len(PLAYER_IMAGES)):
+                self.player_image(level)
+                self.pointer_image(level)
+            self.boss_image()
+
+    def player_image(self, level):
+        return assets.scaled(PLAYER_IMAGES[level], PLAYER_SIZE)
+
+    def pointer_image(self, level):
+        name, size = POINTER_IMAGES[level]
+        return assets.scaled(name, size)
+
+    def boss_image(self):
+        return assets.scaled("boss.png", BOSS_SIZE)
+
+    def load_assets(self):
+        # Converts and scales the images every level needs; per-level ones load on demand
+        self.ball_image = assets.scaled("ball.png", BALL_SIZE)
+        assets.scaled("soybean.png", SOYBEAN_SIZE)
+        assets.build_arrow_frames()
+        Soybean.build_aura_frames()
+        self.player.image = self.player_image(0)
+        self.pointer_image(0)
+        self.assets_ready = True
+
+    def init_audio(self):
+        # Opens the audio device; SDL subsystems are only started from the main thread
+        try:
+            pygame.mixer.init()
+        except pygame.error as e:
+            print(f"Audio unavailable: {e}")
+            return False
+        return True
+
+    def load_audio(self):
+        # Decodes the sounds into the opened mixer; only file work, so lazy startup runs it in a thread
+        try:
+            catch_sound = pygame.mixer.Sound("assets/catch_sound.mp3")  # Load sound effect
+            catch_sound.set_volume(0.2)
+            self.catch_sound = catch_sound
+            pygame.mixer.music.load("assets/quarta_passada.mid")
+        except pygame.error as e:
+            print(f"Audio unavailable: {e}")
+            return
+        self.audio_ready = True
+
+    async def load_assets_async(self):
+        # Decodes files in a worker thread while the menu is already on screen
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, assets.decode, SHARED_IMAGES)
+        self.load_assets()
+        self.startup_metrics["assets_ready_ms"] = (time.perf_counter() - STARTUP_TIME) * 1000
+        if self.init_audio():
+            await loop.run_in_executor(None, self.load_audio)
+        self.startup_metrics["audio_ready_ms"] = (time.perf_counter() - STARTUP_TIME) * 1000
+        if self.music_wanted:
+            self.start_music()
+        self.warm_level(1)
+
+    def warm_level(self, level):
+        # Decodes the images of an upcoming level in the background, if an event loop runs
+        if level < len(PLAYER_IMAGES):
+            names = [PLAYER_IMAGES[level], POINTER_IMAGES[level][0]]
+        else:
+            names = ["boss.png"]
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # Not running under asyncio, the images load on first use
+        self.track(loop.run_in_executor(None, assets.decode, names))
+
+    def track(self, job):
+        # Keeps a background task or future alive until it is done, and reports its failure;
+        # asyncio only holds weak references to tasks and nothing else awaits these
+        self.background_jobs.add(job)
+        job.add_done_callback(self.background_done)
+
+    def background_done(self, job):
+        self.background_jobs.discard(job)
+        if not job.cancelled() and job.exception() is not None:
+            print(f"Background loading failed: {job.exception()!r}")
+
+    def first_frame_drawn(self):
+        if "first_frame_ms" not in self.startup_metrics:
+            self.startup_metrics["first_frame_ms"] = (time.perf_counter() - STARTUP_TIME) * 1000
+            print(f"First frame after {self.startup_metrics['first_frame_ms']:.0f} ms")
 
     def reset_game(self):
         # Reset player HP and position
@@ -262,15 +492,19 @@ class Game:
         self.player.rect.center = (self.screen_width // 2, self.screen_height // 2)
 
         # Reset player image to the first image
-        self.player.image = pygame.transform.scale(self.player_images[0], (100, 100))
+        self.player.image = self.player_image(0)
         self.player.rect = self.player.image.get_rect(center=self.player.rect.center)
 
         # Reset level and ball count
         self.current_level = 0
         self.balls_destroyed = 0
+        self.total_balls_destroyed = 0
         self.total_balls_needed = self.levels[self.current_level]
 
-        # Clear all sprites and restart with initial conditions
+        # Clear all sprites and restart with initial conditions; killing the pooled
+        # sprites hands them back to their pools
+        for sprite in self.balls.sprites() + self.soybeans.sprites() + self.player.arrows.sprites():
+            sprite.kill()
         self.all_sprites.empty()
         self.balls.empty()
         self.soybeans.empty()
@@ -283,102 +517,224 @@ class Game:
         # Reset progress bar
         self.progress_bar_length = 0
 
-        # Reset timers and difficulty settings
+        # The menu drew over the whole screen
+        if self.renderer is not None:
+            self.renderer.invalidate()
+
+        # Reset the spawn schedule, load shedding and difficulty settings
+        self.scheduler.reset()
+        self.governor.set_level(0, self.get_ticks())
         self.spawn_interval = INITIAL_BALL_SPAWN_INTERVAL
-        pygame.time.set_timer(SPAWN_BALL_EVENT, self.spawn_interval)
-        self.min_ball_speed = 2.6  # Reset to initial speed
-        self.max_ball_speed = 7.8
+        self.min_ball_speed = MIN_BALL_SPEED  # Reset to initial speed
+        self.max_ball_speed = MAX_BALL_SPEED
 
     def play_music(self):
-        pygame.mixer.music.load("assets/quarta_passada.mid")  # Replace with your MIDI file's path
-        pygame.mixer.music.play(-1)  # Loop the music
-
-    def spawn_ball(self):
-        edge_positions = [
-            (random.randint(0, self.screen_width), 0),  # Top edge
-            (random.randint(0, self.screen_width), self.screen_height),  # Bottom edge
-            (0, random.randint(0, self.screen_height)),  # Left edge
-            (self.screen_width, random.randint(0, self.screen_height))  # Right edge
-        ]
-        x, y = random.choice(edge_positions)
-
-        ball = Ball(x, y, self.screen_width // 2, self.screen_height // 2, self.ball_image)  # Use the same image for all balls
-        ball.speed = random.uniform(self.min_ball_speed, self.max_ball_speed)
-        self.balls.add(ball)
-        self.all_sprites.add(ball)
-
-    def spawn_soybean(self):
-        x = random.randint(20, self.screen_width - 20)
-        y = random.randint(20, self.screen_height - 20)
-        soybean = Soybean(x, y)
-        self.soybeans.add(soybean)
-        self.all_sprites.add(soybean)
+        pygame.mixer.music.play(-1)  # Loop the music, loaded by init_audio
+
+    def start_recording(self):
+        # Reseed so the log's seed reproduces every random draw of the session
+        if self.record_path is None:
+            return
+        self.stop_recording()
+        seed = random.randrange(2 ** 63)
+        self.rng.seed(seed)
+        self.recorder = InputRecorder(self.record_path, seed, self.get_ticks(), self.tick_rate, self.swept_collision)
+
+    def stop_recording(self):
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    def start_music(self):
+        # The music keeps looping across games once it has started; if the audio is
+        # still loading it starts as soon as it is ready
+        self.music_wanted = True
+        if self.audio_ready and not self.music_started:
+            self.play_music()
+            self.music_started = True
+
+    def new_ball(self, spot=None):
+        if spot is None:
+            edge_positions = [
+                (self.rng.randint(0, self.screen_width), 0),  # Top edge
+                (self.rng.randint(0, self.screen_width), self.screen_height),  # Bottom edge
+                (0, self.rng.randint(0, self.screen_height)),  # Left edge
+                (self.screen_width, self.rng.randint(0, self.screen_height))  # Right edge
+            ]
+            x, y = self.rng.choice(edge_positions)
+            spot = (x, y, self.screen_width // 2, self.screen_height // 2)
+
+        # Use the same image for all balls
+        if self.ramp_ball_motion:
+            return self.ball_pool.acquire(*spot, self.ball_image, self.rng, self.min_ball_speed, self.max_ball_speed)
+        ball = self.ball_pool.acquire(*spot, self.ball_image, self.rng)
+        ball.speed = self.rng.uniform(self.min_ball_speed, self.max_ball_speed)  # dx/dy keep the base speed range
+        return ball
+
+    def new_soybean(self, now):
+        x = self.rng.randint(20, self.screen_width - 20)
+        y = self.rng.randint(20, self.screen_height - 20)
+        return self.soybean_pool.acquire(x, y, now)
+
+    def start_spawning(self, now):
+        self.scheduler.started = True
+        self.scheduler.every("balls", self.spawn_interval, now, (SPAWN_BALL, None))
+        self.scheduler.every("soybeans", SOYBEAN_SPAWN_INTERVAL, now, (SPAWN_SOYBEAN, None))
+        self.schedule_waves(now)
+
+    def schedule_waves(self, now):
+        # Replaces the wave streams with the ones of the current level
+        for name in list(self.scheduler.streams):
+            if name.startswith("wave:"):
+                self.scheduler.cancel(name)
+        if self.current_level >= len(self.levels):
+            waves = self.boss_waves
+        elif self.level_waves:
+            waves = self.level_waves[min(self.current_level, len(self.level_waves) - 1)]
+        else:
+            waves = []
+        for pattern, interval in waves:
+            self.scheduler.every("wave:" + pattern, interval, now, (SPAWN_WAVE, pattern))
+
+    def spawn_due(self, now):
+        # Everything that fell due since the last tick is spawned here as one batch
+        if not self.scheduler.started:
+            self.start_spawning(now)
+        balls = []
+        soybeans = []
+        max_balls = self.governor.max_balls  # Scheduled balls are dropped while load shedding caps them
+        for time, (kind, arg) in self.scheduler.due(now):
+            if kind == SPAWN_BALL:
+                if max_balls is not None and len(self.balls) + len(balls) >= max_balls:
+                    continue
+                balls.append(self.new_ball(arg))
+            elif kind == SPAWN_SOYBEAN:
+                soybeans.append(self.new_soybean(time))
+            else:
+                for delay, spot in wave_spawns(WAVE_PATTERNS[arg], self.rng, self.screen_width, self.screen_height,
+                                               self.player.rect.center):
+                    self.scheduler.at(time + delay, (SPAWN_BALL, spot))
+        if balls:
+            self.balls.add(balls)
+            self.all_sprites.add(balls)
+        if soybeans:
+            self.soybeans.add(soybeans)
+            self.all_sprites.add(soybeans)
 
     async def run(self):
-        self.main_menu()  # Display the main menu before starting the game
-        self.play_music()  # Start playing the MIDI music
-
-        while self.running:
-            self.handle_events()
-            self.update()
-            self.draw()
-            self.clock.tick(60)  # Maintain 60 FPS
-            await asyncio.sleep(0)
-
+        # Starts on the main menu; assets still loading finish in the background
+        if not self.assets_ready:
+            self.track(asyncio.ensure_future(self.load_assets_async()))
+        await self.scenes.run(self)
+        self.stop_recording()
+
+        if self.profile_path:
+            self.profiler.dump(self.profile_path)
         pygame.quit()
         sys.exit()
 
+    def tick_clock(self):
+        self.now = self.clock()
+
+    def get_ticks(self):
+        return self.now
+
     def handle_events(self):
+        recorder = self.recorder
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
-            elif event.type == SPAWN_BALL_EVENT:
-                self.spawn_ball()
-            elif event.type == SPAWN_SOYBEAN_EVENT:
-                self.spawn_soybean()
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 angle = self.get_angle_to_mouse()
                 self.player.shoot(angle)
+                if recorder is not None:
+                    recorder.shoot(angle)
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                self.show_profiler = not self.show_profiler
 
     def display_lose_message(self):
-        self.screen.fill((0, 0, 0))
-        lose_text = self.font.render("You Lose", True, (255, 0, 0))
-        self.screen.blit(lose_text, (self.screen_width // 2 - lose_text.get_width() // 2, self.screen_height // 2 - lose_text.get_height() // 2))
-        pygame.display.flip()
-        pygame.time.wait(5000)  # Wait for 5 seconds
-        self.reset_game()  # Reset the game state
-        self.main_menu()  # Go back to the main menu
+        # Shown for 5 seconds before going back to the main menu
+        self.stop_recording()
+        self.scenes.switch(EndScene(self, "You Lose", (255, 0, 0)))
+
+    def get_keys(self):
+        return pygame.key.get_pressed()
+
+    def govern(self):
+        # Feeds the frame's work time to the load governor; level changes alter the
+        # ball cap, so recordings log them for the next tick
+        level = self.governor.end_frame(self.profiler.work(), self.get_ticks())
+        if level is not None and self.recorder is not None:
+            self.recorder.load_level(level)
 
     def update(self):
-        keys = pygame.key.get_pressed()
-        self.player.update(keys)
-        self.player.arrows.update()
-        self.balls.update()
-        self.soybeans.update()
+        now = self.get_ticks()
+        keys = self.get_keys()
+        if self.recorder is not None:
+            self.recorder.end_tick(now, keys)
+        self.spawn_due(now)
+        scale = self.tick_scale
+        swept = self.swept_collision
+        player_start = self.player.rect.center
+        self.player.update(keys, scale)
+        player_moved = (self.player.rect.centerx - player_start[0], self.player.rect.centery - player_start[1])
+        self.player.arrows.update(scale)
+        self.balls.update(scale)
+        self.soybeans.update(now)
+        self.profiler.lap("update.move")
 
         # Boss attacks during the final level
         if hasattr(self, 'boss') and self.boss.alive():
-            self.boss.update(self.player, self.balls, self.ball_image)
+            self.boss.update(self.player, self.balls, self.ball_image, now)
 
             # Check if player's arrows hit the boss
-            boss_hit = pygame.sprite.spritecollide(self.boss, self.player.arrows, True)
+            if swept and self.use_projectile_engine:
+                boss_hit = self.player.arrows.swept_collide(self.boss.rect.center, (0, 0), BOSS_RADIUS + ARROW_RADIUS,
+                                                            scale, True)
+            elif swept:
+                boss_hit = swept_spritecollide(self.boss.rect.center, (0, 0), self.player.arrows,
+                                               BOSS_RADIUS + ARROW_RADIUS, scale, True)
+            elif self.use_projectile_engine:
+                boss_hit = self.player.arrows.collide_rect(self.boss.rect, True)
+            else:
+                boss_hit = spritecollide(self.boss, self.player.arrows, True)
             if boss_hit:
                 self.boss.reduce_health(5)  # Reduce boss health when hit
 
             # Check if the boss is defeated
             if not self.boss.alive():
                 self.display_win_message()
+        self.profiler.lap("update.boss")
 
         # Handle other collisions and level progress as before
         # Check for collisions between arrows and balls
-        collisions = pygame.sprite.groupcollide(self.balls, self.player.arrows, True, True)
+        if swept and self.use_projectile_engine:
+            collisions = self.balls.swept_groupcollide(self.player.arrows, BALL_RADIUS + ARROW_RADIUS, scale, True, True)
+        elif swept:
+            collisions = swept_groupcollide(self.balls, self.player.arrows, BALL_RADIUS + ARROW_RADIUS, scale, True, True,
+                                            self.collision_grid)
+        elif self.use_projectile_engine:
+            collisions = self.balls.groupcollide(self.player.arrows, True, True)
+        else:
+            collisions = groupcollide(self.balls, self.player.arrows, True, True)
         if collisions:
             destroyed = sum(len(v) for v in collisions.values())
             self.balls_destroyed += destroyed
+            self.total_balls_destroyed += destroyed
             self.update_progress_bar()
 
         # Check for collisions between the player and balls
-        if pygame.sprite.spritecollide(self.player, self.balls, True):
+        if swept and self.use_projectile_engine:
+            player_hit = self.balls.swept_collide(self.player.rect.center, player_moved, PLAYER_RADIUS + BALL_RADIUS,
+                                                  scale, True)
+        elif swept:
+            player_hit = swept_spritecollide(self.player.rect.center, player_moved, self.balls,
+                                             PLAYER_RADIUS + BALL_RADIUS, scale, True)
+        elif self.use_projectile_engine:
+            player_hit = self.balls.collide_rect(self.player.rect, True)
+        else:
+            player_hit = spritecollide(self.player, self.balls, True)
+        if player_hit:
             self.player.reduce_hp()
             if self.player.hp <= 0:
                 self.display_lose_message()  # Call the lose message display function
@@ -386,24 +742,110 @@ class Game:
 
         # Check for collisions between the player and soybeans
         if pygame.sprite.spritecollide(self.player, self.soybeans, True):
-            self.catch_sound.play()  # Play the catch sound effect
+            if self.catch_sound is not None:
+                self.catch_sound.play()  # Play the catch sound effect
             self.player.increase_hp()
 
         # Check if the level is complete
         if self.balls_destroyed >= self.total_balls_needed and not hasattr(self, 'boss'):
             self.next_level()
+        self.profiler.lap("update.collide")
+
+    def snapshot(self):
+        # Plain-data copy of the simulation state, restorable with restore()
+        boss = getattr(self, 'boss', None)
+        if self.use_projectile_engine:
+            # The engine moves float positions; rects only follow them when synced
+            self.balls.sync()
+            self.player.arrows.sync()
+            ball_center = self.balls.position
+            arrow_center = self.player.arrows.position
+        else:
+            ball_center = arrow_center = lambda sprite: sprite.rect.center
+        return {
+            "now": self.now,
+            "rng": self.rng.getstate(),
+            "level": (self.current_level, self.balls_destroyed, self.total_balls_destroyed, self.total_balls_needed,
+                      self.progress_bar_length),
+            "difficulty": (self.spawn_interval, self.min_ball_speed, self.max_ball_speed),
+            "spawns": self.scheduler.state(),
+            "load_level": self.governor.level,
+            "player": (tuple(self.player.rect), self.player.hp),
+            "balls": [(tuple(b.rect), ball_center(b), b.dx, b.dy, b.speed) for b in self.balls],
+            "arrows": [(tuple(a.rect), arrow_center(a), a.dx, a.dy, a.angle) for a in self.player.arrows],
+            "soybeans": [(tuple(s.rect), s.spawn_time) for s in self.soybeans],
+            "boss": None if boss is None else (tuple(boss.rect), boss.health, boss.last_shot_time, boss.alive()),
+        }
+
+    def restore(self, state):
+        for sprite in self.balls.sprites() + self.soybeans.sprites() + self.player.arrows.sprites():
+            sprite.kill()
+        self.now = state["now"]
+        (self.current_level, self.balls_destroyed, self.total_balls_destroyed, self.total_balls_needed,
+         self.progress_bar_length) = state["level"]
+        self.spawn_interval, self.min_ball_speed, self.max_ball_speed = state["difficulty"]
+        self.scheduler.set_state(state["spawns"])
+        self.governor.level = state["load_level"]
+
+        rect, self.player.hp = state["player"]
+        self.player.image = self.player_image(min(self.current_level, len(PLAYER_IMAGES) - 1))
+        self.player.rect = pygame.Rect(rect)
+
+        for rect, center, dx, dy, speed in state["balls"]:
+            ball = self.ball_pool.acquire(0, 0, 0, 0, self.ball_image, self.rng)
+            ball.rect = pygame.Rect(rect)
+            ball.dx, ball.dy, ball.speed = dx, dy, speed
+            self.balls.add(ball)
+            self.all_sprites.add(ball)
+            if self.use_projectile_engine:
+                self.balls.place(ball, center)
+        for rect, center, dx, dy, angle in state["arrows"]:
+            arrow = self.arrow_pool.acquire(0, 0, angle)
+            arrow.rect = pygame.Rect(rect)
+            arrow.dx, arrow.dy = dx, dy
+            self.player.arrows.add(arrow)
+            if self.use_projectile_engine:
+                self.player.arrows.place(arrow, center)
+        for rect, spawn_time in state["soybeans"]:
+            soybean = self.soybean_pool.acquire(0, 0, spawn_time)
+            soybean.rect = pygame.Rect(rect)
+            self.soybeans.add(soybean)
+            self.all_sprites.add(soybean)
+
+        if hasattr(self, 'boss'):
+            self.boss.kill()
+            del self.boss
+        if state["boss"] is not None:
+            rect, health, last_shot_time, alive = state["boss"]
+            self.boss = Boss(0, 0, self.boss_image(), health, last_shot_time, self.rng, self.ball_pool.acquire)
+            self.boss.rect = pygame.Rect(rect)
+            if alive:
+                self.all_sprites.add(self.boss)
+
+        # Sprite construction above may draw from the RNG, so restore it last
+        self.rng.setstate(state["rng"])
+
+    def pool_stats(self):
+        # Live, free, high-water and created counts of each sprite pool, for monitoring
+        return {
+            "arrows": self.arrow_pool.stats(),
+            "balls": self.ball_pool.stats(),
+            "soybeans": self.soybean_pool.stats(),
+        }
 
     def update_progress_bar(self):
         progress = self.balls_destroyed / self.total_balls_needed
         self.progress_bar_length = 200 * min(progress, 1)  # Ensure it doesn't exceed 200
 
     def start_boss_level(self):
-        self.boss = Boss(self.screen_width // 2, self.screen_height // 4, self.boss_image, health=100)  # Correct image used here
+        self.boss = Boss(self.screen_width // 2, self.screen_height // 4, self.boss_image(), health=100, now=self.get_ticks(), rng=self.rng,
+                         ball_factory=self.ball_pool.acquire, shoot_cooldown=self.boss_shoot_cooldown)  # Correct image used here
         self.all_sprites.add(self.boss)
         print("Boss level started!")
 
     def next_level(self):
         self.current_level += 1
+        self.warm_level(self.current_level + 1)
         if self.current_level < len(self.levels):
             # Normal levels
             self.total_balls_needed = self.levels[self.current_level]
@@ -411,28 +853,25 @@ class Game:
             self.progress_bar_length = 0
 
             # Increase difficulty for the next level
-            self.spawn_interval = max(140, int(self.spawn_interval * 0.7))  # 30% faster spawns
-            pygame.time.set_timer(SPAWN_BALL_EVENT, self.spawn_interval)
-            self.min_ball_speed *= 1.3  # Increase minimum ball speed by 30%
-            self.max_ball_speed *= 1.3  # Increase maximum ball speed by 30%
+            self.spawn_interval = max(140, int(self.spawn_interval * self.spawn_interval_decay))  # 30% faster spawns
+            self.scheduler.every("balls", self.spawn_interval, self.get_ticks(), (SPAWN_BALL, None))
+            self.min_ball_speed *= self.ball_speed_ramp  # Increase minimum ball speed by 30%
+            self.max_ball_speed *= self.ball_speed_ramp  # Increase maximum ball speed by 30%
 
             # Update player's image for the next level
-            self.player.image = pygame.transform.scale(self.player_images[self.current_level], (100, 100))
+            self.player.image = self.player_image(min(self.current_level, len(PLAYER_IMAGES) - 1))
             self.player.rect = self.player.image.get_rect(center=self.player.rect.center)
 
             print(f"Level {self.current_level + 1} started! Destroy {self.total_balls_needed} balls.")
         else:
             # Final level with the boss
             self.start_boss_level()
+        self.schedule_waves(self.get_ticks())
 
     def display_win_message(self):
-        self.screen.fill((0, 0, 0))
-        win_text = self.font.render("You Won!", True, (255, 255, 255))
-        self.screen.blit(win_text, (self.screen_width // 2 - win_text.get_width() // 2, self.screen_height // 2 - win_text.get_height() // 2))
-        pygame.display.flip()
-        pygame.time.wait(5000)  # Wait for 5 seconds
-        self.reset_game()  # Reset the game state
-        self.main_menu()  # Go back to the main menu
+        # Shown for 5 seconds before going back to the main menu
+        self.stop_recording()
+        self.scenes.switch(EndScene(self, "You Won!", (255, 255, 255)))
 
     def get_angle_to_mouse(self):
         mouse_x, mouse_y = pygame.mouse.get_pos()
@@ -440,54 +879,127 @@ class Game:
         angle = math.degrees(math.atan2(-rel_y, rel_x))  # Negative because pygame's y-axis increases downwards
         return angle
 
+    def get_pointer(self):
+        # Pointer image and rect at the end of the aiming line, if this level has one
+        if self.current_level >= len(POINTER_IMAGES):
+            return None
+        angle = self.get_angle_to_mouse()
+        line_length = 50
+        end_x = self.player.rect.centerx + line_length * math.cos(math.radians(angle))
+        end_y = self.player.rect.centery - line_length * math.sin(math.radians(angle))
+        pointer_image = self.pointer_image(self.current_level)
+        return pointer_image, pointer_image.get_rect(center=(end_x, end_y))
+
+    def present(self):
+        # Shows what was drawn onto self.screen
+        if self.gpu is not None:
+            self.gpu.present_surface(self.screen)
+        else:
+            pygame.display.flip()
+
     def draw(self):
+        if self.gpu is not None:
+            self.gpu.draw(self)
+            return
+        if self.renderer is not None:
+            self.draw_dirty()
+            return
+
         self.screen.fill((0, 0, 0))  # Clear screen with black
 
-        # Draw auras for soybeans
-        for sprite in self.all_sprites:
-            if isinstance(sprite, Soybean):
-                sprite.draw_aura(self.screen)
+        # Draw auras for soybeans, unless load shedding dropped them
+        now = self.get_ticks()
+        if self.governor.auras:
+            for soybean in self.soybeans:
+                soybean.draw_aura(self.screen, now)
+
+        # Projectile engine positions live in arrays, copy them into the sprite rects first
+        if self.use_projectile_engine:
+            self.balls.sync()
+            self.player.arrows.sync()
 
         # Draw all sprites (including soybeans, player, balls, etc.)
         self.all_sprites.draw(self.screen)
         self.player.arrows.draw(self.screen)
 
-        # Calculate the position to draw the pointer
-        angle = self.get_angle_to_mouse()
-        line_length = 50
-        end_x = self.player.rect.centerx + line_length * math.cos(math.radians(angle))
-        end_y = self.player.rect.centery - line_length * math.sin(math.radians(angle))
+        # Draw the pointer at the end of the aiming line
+        pointer = self.get_pointer()
+        if pointer is not None:
+            self.screen.blit(*pointer)
+        self.profiler.lap("draw.sprites")
 
-        # Ensure we don't access a pointer image out of range
-        if self.current_level < len(self.pointer_images):
-            pointer_image = self.pointer_images[self.current_level]
-            pointer_rect = pointer_image.get_rect(center=(end_x, end_y))
-            self.screen.blit(pointer_image, pointer_rect)
+        # Draw HP bar, progress bar, labels and the boss health bar from the cached HUD panels
+        if self.governor.hud_due() or self.hud.panel is None:
+            self.hud.update(self)
+        self.hud.blit(self.screen)
 
-        # Draw HP bar
-        pygame.draw.rect(self.screen, (255, 0, 0), (10, 10, 200, 20))  # Red background
-        pygame.draw.rect(self.screen, (0, 255, 0), (10, 10, 20 * self.player.hp, 20))  # Green HP
-
-        # Draw Progress bar
-        pygame.draw.rect(self.screen, (255, 255, 0), (10, 40, self.progress_bar_length, 20))  # Yellow progress
-
-        # Display Level and Balls Destroyed
-        level_text = self.font.render(f"Level: {self.current_level + 1}/{len(self.levels)}", True, (255, 255, 255))
-        balls_text = self.font.render(f"Balls Destroyed: {self.balls_destroyed}/{self.total_balls_needed}", True, (255, 255, 255))
-        hp_text = self.font.render(f"HP: {self.player.hp}", True, (255, 255, 255))
-        self.screen.blit(level_text, (10, 70))
-        self.screen.blit(balls_text, (10, 100))
-        self.screen.blit(hp_text, (10, 130))
-
-        # Draw Boss Health Bar if the boss exists
-        if hasattr(self, 'boss') and self.boss.alive():
-            boss_health_text = self.font.render("Boss Health", True, (255, 255, 255))
-            self.screen.blit(boss_health_text, (self.screen_width // 2 - boss_health_text.get_width() // 2, 20))
-            pygame.draw.rect(self.screen, (255, 0, 0), (self.screen_width // 2 - 100, 50, 200, 20))
-            pygame.draw.rect(self.screen, (0, 255, 0), (self.screen_width // 2 - 100, 50, 2 * self.boss.health, 20))
+        if self.show_profiler:
+            self.profiler.draw_overlay(self.screen, self.debug_font)
+        self.profiler.lap("draw.hud")
 
         pygame.display.flip()
+        self.profiler.lap("flip")
+
+    def draw_dirty(self):
+        # Same picture as draw(), but only erases, redraws and presents changed rects
+        renderer = self.renderer
+        renderer.begin_frame()
+        if self.use_projectile_engine:
+            self.balls.sync()
+            self.player.arrows.sync()
+        pointer = self.get_pointer()
+
+        # The HUD stays on screen between frames; redraw it when it changed or when
+        # a sprite is erased from or drawn over it
+        hud_area = self.hud.rects() if self.hud.panel is not None else []
+        hud_changed = (self.governor.hud_due() or self.hud.panel is None) and self.hud.update(self)
+        hud_area += self.hud.rects()
+        sprite_rects = [sprite.rect for sprite in self.all_sprites]
+        sprite_rects += [arrow.rect for arrow in self.player.arrows]
+        sprite_rects += [sprite.rect.inflate(30, 30) for sprite in self.soybeans]  # Auras
+        if pointer is not None:
+            sprite_rects.append(pointer[1])
+        redraw_hud = renderer.full or hud_changed or any(
+            rect.collidelist(renderer.dirty) != -1 or rect.collidelist(sprite_rects) != -1 for rect in hud_area)
+        if redraw_hud:
+            for rect in hud_area:
+                renderer.erase(rect)
+
+        now = self.get_ticks()
+        if self.governor.auras:
+            for soybean in self.soybeans:
+                renderer.track([soybean.draw_aura(self.screen, now)])
+        renderer.draw_group(self.all_sprites)
+        renderer.draw_group(self.player.arrows)
+        if pointer is not None:
+            renderer.blit(*pointer)
+        self.profiler.lap("draw.sprites")
+
+        if redraw_hud:
+            renderer.mark(self.hud.blit(self.screen))
+        if self.show_profiler:
+            renderer.track(self.profiler.draw_overlay(self.screen, self.debug_font))
+        self.profiler.lap("draw.hud")
+
+        renderer.present()
+        self.profiler.lap("flip")
 
 if __name__ == "__main__":
-    game = Game()
+    parser = argparse.ArgumentParser(description="SoyBoyz Adventure")
+    parser.add_argument("--profile", metavar="PATH", help="dump frame timings to a .csv or .json file on exit")
+    parser.add_argument("--overlay", action="store_true", help="show the frame time overlay (toggle with F3)")
+    parser.add_argument("--dirty-rects", action="store_true", help="present only the changed parts of the screen")
+    parser.add_argument("--record", metavar="PATH", help="record each game's input to PATH for replay.py")
+    parser.add_argument("--backend", choices=["surface", "gpu"], default="surface",
+                        help="draw with software surfaces or SDL2 renderer textures")
+    parser.add_argument("--tick-rate", type=tick_rate_arg, default=BASE_TICK_RATE,
+                        help="simulation ticks per second, e.g. 30 to halve update cost; below 60 uses swept collision")
+    parser.add_argument("--engine", action="store_true", help="move balls and arrows with the NumPy projectile engine")
+    args = parser.parse_args()
+    if args.engine and np is None:
+        parser.error("--engine needs numpy installed")
+
+    game = Game(profile_path=args.profile, show_profiler=args.overlay, dirty_rects=args.dirty_rects,
+                record_path=args.record, lazy_assets=True, backend=args.backend, tick_rate=args.tick_rate,
+                use_projectile_engine=args.engine)
     asyncio.run( game.run() )
@@ -0,0 +1,228 @@
+import struct
+import sys
+from array import array
+
+# Snapshot wire format (little endian). Positions are quantised to 1/2 px in int16; sprite
+# rects are whole pixels, and the coarser step keeps deltas of a few ticks within int8.
+#   header:   tick (uint32), baseline tick (uint32, NO_BASELINE for a full snapshot),
+#             server game time (uint32), outcome (uint8)
+#   level:    current level, level count (uint8), balls destroyed, balls needed (uint16)
+#   players:  count (uint8), then x, y (int16) and HP (uint8) each
+#   boss:     present (uint8), x, y (int16), health (uint8)
+#   per entity kind (balls, arrows, soybeans), columns of:
+#             removed/full/delta counts (uint16), removed ids, full ids, x, y and the kind's
+#             extra field, then a bitmask over the baseline's remaining ids in ascending order
+#             marking the moved ones, and their int8 dx, dy against the baseline
+# Entities that did not change since the baseline cost one bit.
+QUANT = 2
+NO_BASELINE = 0xFFFFFFFF
+SNAP_DISTANCE = 100 * QUANT  # Larger jumps between snapshots are shown without interpolating
+HEADER = struct.Struct("<IIIB")
+LEVEL = struct.Struct("<BBHH")
+PLAYER = struct.Struct("<hhB")
+BOSS = struct.Struct("<BhhB")
+COUNTS = struct.Struct("<HHH")
+
+OUTCOME_NONE = 0
+OUTCOME_WIN = 1
+OUTCOME_LOSE = 2
+
+# Entity kinds and the array typecode of the field each sends besides its position
+ENTITY_KINDS = (("balls", None), ("arrows", "B"), ("soybeans", "I"))
+
+SWAP = sys.byteorder == "big"  # Columns are written little endian
+
+
+def quantise(value):
+    return max(-32768, min(32767, round(value * QUANT)))
+
+
+def column(typecode, values):
+    data = array(typecode, values)
+    if SWAP:
+        data.byteswap()
+    return data.tobytes()
+
+
+def read_column(typecode, data, offset, count):
+    values = array(typecode)
+    end = offset + count * values.itemsize
+    values.frombytes(data[offset:end])
+    if SWAP:
+        values.byteswap()
+    return values, end
+
+
+# Stable network ids for sprites; a sprite keeps its id while it stays in its group
+class EntityIds:
+    def __init__(self):
+        self.ids = {}
+        self.next_id = 0
+
+    def sync(self, sprites):
+        ids = {}
+        known = self.ids
+        for sprite in sprites:
+            entity_id = known.get(sprite)
+            if entity_id is None:
+                entity_id = self.next_id
+                self.next_id = (self.next_id + 1) & 0xFFFF
+            ids[sprite] = entity_id
+        self.ids = ids
+        return ids
+
+
+def capture(game, ids, tick, outcome=OUTCOME_NONE):
+    # Quantised plain-data state of a game; ids holds an EntityIds per entity kind
+    if game.use_projectile_engine:
+        game.balls.sync()
+        game.player.arrows.sync()
+    balls = {}
+    for sprite, entity_id in ids["balls"].sync(game.balls).items():
+        x, y = sprite.rect.center
+        balls[entity_id] = (quantise(x), quantise(y))
+    arrows = {}
+    for sprite, entity_id in ids["arrows"].sync(game.player.arrows).items():
+        x, y = sprite.rect.center
+        arrows[entity_id] = (quantise(x), quantise(y), int(sprite.angle % 360 * 256 / 360) & 0xFF)
+    soybeans = {}
+    for sprite, entity_id in ids["soybeans"].sync(game.soybeans).items():
+        x, y = sprite.rect.center
+        soybeans[entity_id] = (quantise(x), quantise(y), sprite.spawn_time)
+    boss = getattr(game, 'boss', None)
+    return {
+        "tick": tick,
+        "time": game.get_ticks(),
+        "outcome": outcome,
+        "level": (game.current_level, len(game.levels), game.balls_destroyed, game.total_balls_needed),
+        "players": [(quantise(p.rect.centerx), quantise(p.rect.centery), min(max(p.hp, 0), 255))
+                    for p in getattr(game, 'players', [game.player])],
+        "boss": None if boss is None or not boss.alive() else
+        (quantise(boss.rect.centerx), quantise(boss.rect.centery), max(boss.health, 0)),
+        "balls": balls,
+        "arrows": arrows,
+        "soybeans": soybeans,
+    }
+
+
+def encode(state, baseline=None):
+    # Bytes for state, delta compressed against baseline (a state the receiver holds)
+    parts = [
+        HEADER.pack(state["tick"], NO_BASELINE if baseline is None else baseline["tick"], state["time"],
+                    state["outcome"]),
+        LEVEL.pack(*state["level"]),
+        bytes([len(state["players"])]),
+    ]
+    parts += [PLAYER.pack(*player) for player in state["players"]]
+    boss = state["boss"]
+    parts.append(BOSS.pack(0, 0, 0, 0) if boss is None else BOSS.pack(1, *boss))
+
+    for kind, extra in ENTITY_KINDS:
+        current = state[kind]
+        old = baseline[kind] if baseline is not None else {}
+        removed = [entity_id for entity_id in old if entity_id not in current]
+        kept = sorted(entity_id for entity_id in old if entity_id in current)
+        full_ids, xs, ys, extras = [], [], [], []
+        mask = bytearray((len(kept) + 7) // 8)
+        dxs, dys = [], []
+        for bit, entity_id in enumerate(kept):
+            values = current[entity_id]
+            previous = old[entity_id]
+            if previous == values:
+                continue
+            dx = values[0] - previous[0]
+            dy = values[1] - previous[1]
+            if values[2:] == previous[2:] and -128 <= dx <= 127 and -128 <= dy <= 127:
+                mask[bit >> 3] |= 1 << (bit & 7)
+                dxs.append(dx)
+                dys.append(dy)
+            else:
+                full_ids.append(entity_id)  # Changed too much for a delta
+        full_ids += [entity_id for entity_id in current if entity_id not in old]
+        for entity_id in full_ids:
+            values = current[entity_id]
+            xs.append(values[0])
+            ys.append(values[1])
+            if extra is not None:
+                extras.append(values[2])
+        parts.append(COUNTS.pack(len(removed), len(full_ids), len(dxs)))
+        parts += [column("H", removed), column("H", full_ids), column("h", xs), column("h", ys)]
+        if extra is not None:
+            parts.append(column(extra, extras))
+        parts += [bytes(mask), column("b", dxs), column("b", dys)]
+    return b"".join(parts)
+
+
+def decode(data, baselines):
+    # State from encoded bytes; baselines maps ticks to states decoded earlier
+    tick, baseline_tick, time, outcome = HEADER.unpack_from(data)
+    offset = HEADER.size
+    if baseline_tick == NO_BASELINE:
+        baseline = None
+    else:
+        baseline = baselines.get(baseline_tick)
+        if baseline is None:
+            raise ValueError(f"Snapshot {tick} is a delta against unknown snapshot {baseline_tick}")
+    level = LEVEL.unpack_from(data, offset)
+    offset += LEVEL.size
+    count = data[offset]
+    offset += 1
+    players = []
+    for _ in range(count):
+        players.append(PLAYER.unpack_from(data, offset))
+        offset += PLAYER.size
+    present, *boss = BOSS.unpack_from(data, offset)
+    offset += BOSS.size
+    state = {"tick": tick, "time": time, "outcome": outcome, "level": level, "players": players,
+             "boss": tuple(boss) if present else None}
+
+    for kind, extra in ENTITY_KINDS:
+        entities = dict(baseline[kind]) if baseline is not None else {}
+        removed, full, delta = COUNTS.unpack_from(data, offset)
+        offset += COUNTS.size
+        removed_ids, offset = read_column("H", data, offset, removed)
+        for entity_id in removed_ids:
+            del entities[entity_id]
+        kept = sorted(entities)
+        full_ids, offset = read_column("H", data, offset, full)
+        xs, offset = read_column("h", data, offset, full)
+        ys, offset = read_column("h", data, offset, full)
+        if extra is not None:
+            extras, offset = read_column(extra, data, offset, full)
+            for entity_id, x, y, value in zip(full_ids, xs, ys, extras):
+                entities[entity_id] = (x, y, value)
+        else:
+            for entity_id, x, y in zip(full_ids, xs, ys):
+                entities[entity_id] = (x, y)
+        mask = data[offset:offset + (len(kept) + 7) // 8]
+        offset += len(mask)
+        delta_ids = [entity_id for bit, entity_id in enumerate(kept) if mask[bit >> 3] & (1 << (bit & 7))]
+        dxs, offset = read_column("b", data, offset, delta)
+        dys, offset = read_column("b", data, offset, delta)
+        for entity_id, dx, dy in zip(delta_ids, dxs, dys):
+            values = entities[entity_id]
+            entities[entity_id] = (values[0] + dx, values[1] + dy) + values[2:]
+        state[kind] = entities
+    return state
+
+
+def interpolate(a, b, alpha):
+    # View of the game between states a and b (alpha 0..1), in pixels. Entities only in b
+    # are shown where b has them; ones only in a are already gone
+    def lerp(old, new):
+        dx = new[0] - old[0]
+        dy = new[1] - old[1]
+        if abs(dx) > SNAP_DISTANCE or abs(dy) > SNAP_DISTANCE:
+            return new[0] / QUANT, new[1] / QUANT  # Teleported, e.g. a recycled pooled sprite
+        return (old[0] + dx * alpha) / QUANT, (old[1] + dy * alpha) / QUANT
+
+    view = {"time": a["time"] + (b["time"] - a["time"]) * alpha, "level": b["level"], "outcome": b["outcome"]}
+    view["players"] = [lerp(old, new) + new[2:] for old, new in zip(a["players"], b["players"])]
+    view["boss"] = None if b["boss"] is None else (b["boss"][0] / QUANT, b["boss"][1] / QUANT, b["boss"][2])
+    for kind, _ in ENTITY_KINDS:
+        old_entities = a[kind]
+        entities = []
+        for entity_id, values in b[kind].items():
+            entities.append(lerp(old_entities.get(entity_id, values), values) + values[2:])
+        view[kind] = entities
+    return view
@@ -0,0 +1,36 @@
+# Free-list pool for short-lived sprites. Pooled sprite classes hand themselves
+# back with release() when killed, and acquire() reinitialises a recycled one.
+class SpritePool:
+    def __init__(self, sprite_class):
+        self.sprite_class = sprite_class
+        self.free = []
+        self.live = 0
+        self.high_water = 0  # Most sprites alive at once
+        self.created = 0
+
+    def acquire(self, *args):
+        if self.free:
+            sprite = self.free.pop()
+            sprite.reset(*args)
+        else:
+            sprite = self.sprite_class(*args)
+            sprite.pool = self
+            self.created += 1
+        sprite.in_use = True
+        self.live += 1
+        if self.live > self.high_water:
+            self.high_water = self.live
+        return sprite
+
+    def release(self, sprite):
+        sprite.in_use = False
+        self.live -= 1
+        self.free.append(sprite)
+
+    def stats(self):
+        return {
+            "live": self.live,
+            "free": len(self.free),
+            "high_water": self.high_water,
+            "created": self.created,
+        }
@@ -0,0 +1,119 @@
+import csv
+import json
+import time
+from array import array
+
+# Phases of one frame, in the order Game marks them
+PHASES = (
+    "events",
+    "update.move",
+    "update.boss",
+    "update.collide",
+    "draw.sprites",
+    "draw.hud",
+    "flip",
+    "tick",
+)
+COUNTERS = ("balls", "arrows", "soybeans")
+OVERLAY_REFRESH = 30  # Frames between percentile refreshes of the overlay
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+# Per-phase frame timer that keeps the last N frames in preallocated ring buffers
+class FrameProfiler:
+    def __init__(self, capacity=600):
+        self.capacity = capacity
+        self.frames = 0  # Total frames recorded
+        self.slot = 0
+        self.last = 0
+        self.frame_start = 0
+        self.times = {phase: array("q", [0]) * capacity for phase in PHASES}  # Nanoseconds
+        self.frame_times = array("q", [0]) * capacity
+        self.counts = {name: array("l", [0]) * capacity for name in COUNTERS}
+        self.summary = (0.0, 0.0)  # Cached (p50, p99) frame time in milliseconds
+        self.metrics = {}  # One-off measurements such as startup times, in milliseconds
+
+    def begin_frame(self):
+        self.slot = self.frames % self.capacity
+        for times in self.times.values():
+            times[self.slot] = 0
+        self.frame_start = self.last = time.perf_counter_ns()
+
+    def lap(self, phase):
+        # Charge the time since the previous mark to the given phase
+        now = time.perf_counter_ns()
+        self.times[phase][self.slot] += now - self.last
+        self.last = now
+
+    def end_frame(self, balls, arrows, soybeans):
+        slot = self.slot
+        self.frame_times[slot] = time.perf_counter_ns() - self.frame_start
+        self.counts["balls"][slot] = balls
+        self.counts["arrows"][slot] = arrows
+        self.counts["soybeans"][slot] = soybeans
+        self.frames += 1
+        if self.frames % OVERLAY_REFRESH == 0:
+            self.summary = (self.frame_percentile(0.5), self.frame_percentile(0.99))
+
+    def work(self):
+        # Nanoseconds the last recorded frame spent working, without the frame-rate sleep
+        slot = (self.frames - 1) % self.capacity
+        return sum(self.times[phase][slot] for phase in PHASES if phase != "tick")
+
+    def recorded(self):
+        # Slots of the recorded frames, oldest first
+        if self.frames <= self.capacity:
+            return range(self.frames)
+        start = self.frames % self.capacity
+        return [(start + i) % self.capacity for i in range(self.capacity)]
+
+    def frame_percentile(self, fraction):
+        return percentile([self.frame_times[i] for i in self.recorded()], fraction) / 1e6
+
+    def rows(self):
+        first = self.frames - len(self.recorded())
+        for offset, slot in enumerate(self.recorded()):
+            row = {"frame": first + offset, "frame_ms": self.frame_times[slot] / 1e6}
+            for phase in PHASES:
+                row[phase + "_ms"] = self.times[phase][slot] / 1e6
+            for name in COUNTERS:
+                row[name] = self.counts[name][slot]
+            yield row
+
+    def dump(self, path):
+        rows = list(self.rows())
+        if path.endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=["frame", "frame_ms"] + [p + "_ms" for p in PHASES] + list(COUNTERS))
+                writer.writeheader()
+                writer.writerows(rows)
+        else:
+            report = {
+                "p50_ms": self.frame_percentile(0.5),
+                "p99_ms": self.frame_percentile(0.99),
+                "metrics": self.metrics,
+                "frames": rows,
+            }
+            with open(path, "w") as f:
+                json.dump(report, f, indent=1)
+
+    def draw_overlay(self, surface, font):
+        p50, p99 = self.summary
+        slot = (self.frames - 1) % self.capacity
+        lines = [
+            f"p50 {p50:.1f} ms  p99 {p99:.1f} ms",
+            "balls {} arrows {} soy {}".format(*(self.counts[name][slot] for name in COUNTERS)),
+        ]
+        rects = []
+        y = 10
+        for line in lines:
+            text = font.render(line, True, (255, 255, 0))
+            rects.append(surface.blit(text, (surface.get_width() - text.get_width() - 10, y)))
+            y += text.get_height()
+        return rects
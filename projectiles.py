@@ -0,0 +1,212 @@
+import pygame
+
+try:
+    import numpy as np
+except ImportError:  # The projectile engine is optional, the game falls back to plain sprite groups
+    np = None
+
+PAIR_CHUNK = 1 << 20  # Max ball/arrow pairs tested per vectorized batch
+
+
+# Sprite group that keeps its projectiles in contiguous NumPy arrays (struct of arrays).
+# Positions are floats so slow projectiles keep their sub-pixel heading; the sprites'
+# rects are only written back by sync(), right before they are drawn.
+class ProjectileGroup(pygame.sprite.Group):
+    def __init__(self, bounds, capacity=256):
+        if np is None:
+            raise RuntimeError("The projectile engine needs numpy installed")
+        self.bounds = pygame.Rect(bounds)
+        self.count = 0
+        self.slots = {}  # sprite -> index into the arrays
+        self.pos = np.zeros((capacity, 2))  # Centre x, y
+        self.vel = np.zeros((capacity, 2))  # dx, dy per tick
+        self.size = np.zeros((capacity, 2), dtype=np.int32)  # Rect width, height
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.owners = np.empty(capacity, dtype=object)
+        self.dead = 0  # Slots waiting to be compacted
+        super().__init__()
+
+    def grow(self):
+        capacity = len(self.alive) * 2
+        for name in ("pos", "vel", "size", "alive", "owners"):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=object) if name == "owners" else np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        if self.count == len(self.alive):
+            self.grow()
+        i = self.count
+        self.pos[i] = sprite.rect.center
+        self.vel[i] = (sprite.dx, sprite.dy)
+        self.size[i] = sprite.rect.size
+        self.alive[i] = True
+        self.owners[i] = sprite
+        self.slots[sprite] = i
+        self.count += 1
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        i = self.slots.pop(sprite)
+        self.alive[i] = False
+        self.owners[i] = None
+        self.dead += 1
+
+    def compact(self):
+        # Drop dead slots while keeping insertion order, which matches group order
+        n = self.count
+        keep = self.alive[:n]
+        live = int(keep.sum())
+        for name in ("pos", "vel", "size", "owners"):
+            array = getattr(self, name)
+            array[:live] = array[:n][keep]
+        self.owners[live:n] = None
+        self.alive[:live] = True
+        self.alive[live:n] = False
+        self.count = live
+        self.dead = 0
+        self.slots = {sprite: i for i, sprite in enumerate(self.owners[:live].tolist())}
+
+    def boxes(self):
+        # Integer left, top, right, bottom of every slot, as the sprite rects would have them
+        n = self.count
+        size = self.size[:n]
+        topleft = np.floor(self.pos[:n] - size / 2).astype(np.int64)
+        return topleft[:, 0], topleft[:, 1], topleft[:, 0] + size[:, 0], topleft[:, 1] + size[:, 1]
+
+    def update(self, scale=1.0):
+        # Move every projectile at once and kill the ones that left the screen
+        n = self.count
+        self.pos[:n] += self.vel[:n] * scale
+        left, top, right, bottom = self.boxes()
+        bounds = self.bounds
+        gone = self.alive[:n] & ((right < bounds.left) | (left > bounds.right) |
+                                 (bottom < bounds.top) | (top > bounds.bottom))
+        for sprite in self.owners[:n][gone].tolist():
+            sprite.kill()
+        if self.dead:
+            self.compact()
+
+    def position(self, sprite):
+        # Float centre of a projectile, which its synced rect only rounds
+        return tuple(self.pos[self.slots[sprite]].tolist())
+
+    def place(self, sprite, center):
+        # Move a projectile to a float centre, e.g. when restoring a snapshot
+        self.pos[self.slots[sprite]] = center
+
+    def sync(self):
+        # Write the float positions back into the sprite rects for drawing
+        if self.dead:
+            self.compact()
+        left, top, _, _ = self.boxes()
+        for sprite, x, y in zip(self.owners[:self.count].tolist(), left.tolist(), top.tolist()):
+            sprite.rect.topleft = (x, y)
+
+    def collide_rect(self, rect, dokill):
+        # Same result as pygame.sprite.spritecollide for a single sprite rect
+        left, top, right, bottom = self.boxes()
+        hit = self.alive[:self.count] & (left < rect.right) & (right > rect.left) & (top < rect.bottom) & (bottom > rect.top)
+        crashed = self.owners[:self.count][hit].tolist()
+        if dokill:
+            for sprite in crashed:
+                sprite.kill()
+        return crashed
+
+    def groupcollide(self, other, dokilla, dokillb):
+        # Same result as pygame.sprite.groupcollide(self, other, ...). Candidate pairs are
+        # found in vectorized batches; only actual hits are resolved in Python, in group order.
+        if self.dead:
+            self.compact()
+        if other.dead:
+            other.compact()
+        n, m = self.count, other.count
+        if not n or not m:
+            return {}
+        la, ta, ra, ba = self.boxes()
+        lb, tb, rb, bb = other.boxes()
+        pairs = []
+        chunk = max(1, PAIR_CHUNK // m)
+        for start in range(0, n, chunk):
+            end = min(n, start + chunk)
+            hit = ((la[start:end, None] < rb) & (ra[start:end, None] > lb) &
+                   (ta[start:end, None] < bb) & (ba[start:end, None] > tb))
+            rows, cols = np.nonzero(hit)  # Row-major, so ordered by a then b
+            if len(rows):
+                pairs.append((rows + start, cols))
+        return self.resolve(other, pairs, dokilla, dokillb)
+
+    def swept_collide(self, center, moved, radius, scale, dokill):
+        # Projectiles whose centre came within radius of a circle that ended the tick at
+        # center after moving by moved; projectiles moved by vel times scale
+        if self.dead:
+            self.compact()
+        n = self.count
+        end = self.pos[:n] - np.asarray(center, dtype=float)
+        start = end - (self.vel[:n] * scale - np.asarray(moved, dtype=float))
+        hit = swept_hits(start, end - start, radius)
+        crashed = self.owners[:n][hit].tolist()
+        if dokill:
+            for sprite in crashed:
+                sprite.kill()
+        return crashed
+
+    def swept_groupcollide(self, other, radius, scale, dokilla, dokillb):
+        # groupcollide with swept circle tests between the two groups' straight-line paths
+        if self.dead:
+            self.compact()
+        if other.dead:
+            other.compact()
+        n, m = self.count, other.count
+        if not n or not m:
+            return {}
+        end_a = self.pos[:n]
+        start_a = end_a - self.vel[:n] * scale
+        end_b = other.pos[:m]
+        start_b = end_b - other.vel[:m] * scale
+        pairs = []
+        chunk = max(1, PAIR_CHUNK // m)
+        for first in range(0, n, chunk):
+            last = min(n, first + chunk)
+            start = start_a[first:last, None] - start_b  # b's frame of reference
+            motion = (end_a[first:last, None] - end_b) - start
+            rows, cols = np.nonzero(swept_hits(start, motion, radius))
+            if len(rows):
+                pairs.append((rows + first, cols))
+        return self.resolve(other, pairs, dokilla, dokillb)
+
+    def resolve(self, other, pairs, dokilla, dokillb):
+        # Turn hit (row, col) index batches into a groupcollide result, in group order
+        if not pairs:
+            return {}
+        rows = np.concatenate([p[0] for p in pairs]).tolist()
+        cols = np.concatenate([p[1] for p in pairs]).tolist()
+        owners_a = self.owners
+        owners_b = other.owners
+        taken = set()
+        crashed = {}
+        for a, b in zip(rows, cols):
+            if b in taken:
+                continue
+            crashed.setdefault(owners_a[a], []).append(owners_b[b])
+            if dokillb:
+                taken.add(b)
+        for sprite, collision in crashed.items():
+            if dokillb:
+                for hit_sprite in collision:
+                    hit_sprite.kill()
+            if dokilla:
+                sprite.kill()
+        return crashed
+
+
+def swept_hits(start, motion, radius):
+    # Vectorized segment vs circle test: segments start at start and move by motion
+    # (last axis x, y), the circle of the given radius sits at the origin
+    length = (motion * motion).sum(axis=-1)
+    along = -(start * motion).sum(axis=-1)
+    t = np.clip(np.divide(along, length, out=np.zeros_like(along), where=length > 0), 0.0, 1.0)
+    closest = start + motion * t[..., None]
+    return (closest * closest).sum(axis=-1) <= radius * radius
@@ -0,0 +1,112 @@
+import struct
+import pygame
+
+# Input log layout (little endian):
+#   header: magic, format version, RNG seed (int64), game time at start (uint32),
+#           tick rate (uint8), swept collision flag (uint8)
+#   per tick: time delta (uint16, RESYNC then uint32 absolute time if it does not fit),
+#             key bitmask (uint8), event count (uint8), then the events:
+#             EVENT_SHOOT followed by the angle (float64), or
+#             EVENT_LOAD_LEVEL followed by the new load shedding level (uint8)
+# Spawns are not logged, the game schedules them from the seeded RNG and the tick times
+MAGIC = b"SBRP"
+VERSION = 4
+HEADER = struct.Struct("<4sBqIBB")
+MAX_TICK_RATE = 255  # The header stores the tick rate in one byte
+TICK = struct.Struct("<HBB")
+RESYNC = 0xFFFF
+ABSOLUTE = struct.Struct("<I")
+ANGLE = struct.Struct("<d")
+LEVEL = struct.Struct("<B")
+
+EVENT_SHOOT = 3
+EVENT_LOAD_LEVEL = 4  # The ball cap of load shedding changes what the simulation spawns
+
+# Keys Player.update reads, one bit each
+TRACKED_KEYS = (
+    pygame.K_LEFT, pygame.K_a, pygame.K_RIGHT, pygame.K_d,
+    pygame.K_UP, pygame.K_w, pygame.K_DOWN, pygame.K_s,
+)
+
+
+def key_mask(keys):
+    mask = 0
+    for bit, key in enumerate(TRACKED_KEYS):
+        if keys[key]:
+            mask |= 1 << bit
+    return mask
+
+
+def mask_keys(mask):
+    return [key for bit, key in enumerate(TRACKED_KEYS) if mask & (1 << bit)]
+
+
+# Writes the per-tick input of a session into a compact binary log
+class InputRecorder:
+    def __init__(self, path, seed, now, tick_rate, swept):
+        self.file = open(path, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, seed, now, tick_rate, swept))
+        self.last_time = now
+        self.events = bytearray()
+        self.event_count = 0
+
+    def shoot(self, angle):
+        self.events.append(EVENT_SHOOT)
+        self.events += ANGLE.pack(angle)
+        self.event_count += 1
+
+    def load_level(self, level):
+        self.events.append(EVENT_LOAD_LEVEL)
+        self.events += LEVEL.pack(level)
+        self.event_count += 1
+
+    def end_tick(self, now, keys):
+        delta = now - self.last_time
+        if 0 <= delta < RESYNC:
+            self.file.write(TICK.pack(delta, key_mask(keys), self.event_count))
+        else:
+            self.file.write(TICK.pack(RESYNC, key_mask(keys), self.event_count))
+            self.file.write(ABSOLUTE.pack(now))
+        self.file.write(self.events)
+        self.last_time = now
+        self.events.clear()
+        self.event_count = 0
+
+    def close(self):
+        self.file.close()
+
+
+# Parsed input log: seed, start time, simulation settings and a list of (time, key mask, events) per tick,
+# where events are (kind, shot angle or load shedding level)
+class InputLog:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, self.seed, self.start, self.tick_rate, swept = HEADER.unpack_from(data)
+        self.swept = bool(swept)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} input log")
+
+        self.ticks = []
+        now = self.start
+        offset = HEADER.size
+        while offset < len(data):
+            delta, mask, count = TICK.unpack_from(data, offset)
+            offset += TICK.size
+            if delta == RESYNC:
+                now = ABSOLUTE.unpack_from(data, offset)[0]
+                offset += ABSOLUTE.size
+            else:
+                now += delta
+            events = []
+            for _ in range(count):
+                kind = data[offset]
+                offset += 1
+                if kind == EVENT_SHOOT:
+                    value = ANGLE.unpack_from(data, offset)[0]
+                    offset += ANGLE.size
+                else:
+                    value = LEVEL.unpack_from(data, offset)[0]
+                    offset += LEVEL.size
+                events.append((kind, value))
+            self.ticks.append((now, mask, events))
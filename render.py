@@ -0,0 +1,61 @@
+import pygame
+
+FULL_FLIP_FRACTION = 0.5  # Above this share of the screen a full flip is cheaper than a rect list
+
+
+# Dirty-rectangle tracker for a solid background: erases what was drawn last frame
+# and presents only the rects that changed, falling back to a full flip
+class DirtyRenderer:
+    def __init__(self, surface, background=(0, 0, 0), full_flip_fraction=FULL_FLIP_FRACTION):
+        self.surface = surface
+        self.background = background
+        self.flip_area = full_flip_fraction * surface.get_width() * surface.get_height()
+        self.drawn = []  # Rects drawn this frame, erased at the start of the next one
+        self.dirty = []  # Rects to present this frame
+        self.full = True  # Redraw and flip the whole screen on the next frame
+
+    def invalidate(self):
+        # Call after anything else drew on the screen (menus, end screens)
+        self.full = True
+
+    def begin_frame(self):
+        if self.full:
+            self.surface.fill(self.background)
+        else:
+            fill = self.surface.fill
+            for rect in self.drawn:
+                fill(self.background, rect)
+        self.dirty = self.drawn
+        self.drawn = []
+
+    def erase(self, rect):
+        self.surface.fill(self.background, rect)
+        self.dirty.append(rect)
+
+    def blit(self, image, dest):
+        rect = self.surface.blit(image, dest)
+        self.drawn.append(rect)
+        self.dirty.append(rect)
+        return rect
+
+    def draw_group(self, group):
+        blit = self.blit
+        for sprite in group:
+            blit(sprite.image, sprite.rect)
+
+    def track(self, rects):
+        # Rects drawn directly on the surface that have to be erased next frame
+        self.drawn.extend(rects)
+        self.dirty.extend(rects)
+
+    def mark(self, rects):
+        # Rects drawn directly on the surface that stay until they change
+        self.dirty.extend(rects)
+
+    def present(self):
+        dirty = self.dirty
+        if self.full or sum(rect.w * rect.h for rect in dirty) > self.flip_area:
+            pygame.display.flip()
+            self.full = False
+        elif dirty:
+            pygame.display.update(dirty)
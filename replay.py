@@ -0,0 +1,143 @@
+import os
+import sys
+
+# Replays run without a window unless asked to render
+if "--render" not in sys.argv:
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import time
+import pygame
+import main
+from projectiles import np
+from recording import InputLog, EVENT_SHOOT, mask_keys
+from sim import SimClock, PressedKeys
+
+SNAPSHOT_INTERVAL = 600  # Ticks between state snapshots used for seeking
+
+
+# Game driven tick by tick from a recorded input log, as fast as the CPU allows
+class ReplayGame(main.Game):
+    def __init__(self, log, render=False, snapshot_interval=SNAPSHOT_INTERVAL, **kwargs):
+        self.log = log
+        self.sim_clock = SimClock(log.start)
+        super().__init__(clock=self.sim_clock, tick_rate=log.tick_rate, swept_collision=log.swept, **kwargs)
+        self.render = render
+        self.snapshot_interval = snapshot_interval
+        self.key_states = {}
+        self.keys = PressedKeys()
+        self.outcome = None
+
+        # Same starting state as a live session right after Play was clicked
+        self.reset_game()
+        self.tick_clock()
+        self.rng.seed(log.seed)
+        self.tick = 0
+        self.snapshots = {0: self.snapshot()}
+
+    def get_keys(self):
+        return self.keys
+
+    def display_lose_message(self):
+        self.outcome = "lose"
+
+    def display_win_message(self):
+        self.outcome = "win"
+
+    def step(self):
+        now, mask, events = self.log.ticks[self.tick]
+        self.tick += 1
+        self.sim_clock.time = now
+        self.tick_clock()
+
+        # Shots and load shedding changes in the order the live game made them; spawns
+        # come from the schedule in update()
+        for kind, value in events:
+            if kind == EVENT_SHOOT:
+                self.player.shoot(value)
+            else:
+                self.governor.set_level(value, now)
+
+        keys = self.key_states.get(mask)
+        if keys is None:
+            keys = self.key_states[mask] = PressedKeys(mask_keys(mask))
+        self.keys = keys
+        self.update()
+
+        if self.tick % self.snapshot_interval == 0:
+            self.snapshots[self.tick] = self.snapshot()
+        if self.render:
+            pygame.event.pump()
+            self.draw()
+
+    def play(self, until=None):
+        # Play up to the given tick, or to the end of the log
+        end = len(self.log.ticks) if until is None else min(until, len(self.log.ticks))
+        while self.tick < end:
+            self.step()
+
+    def seek(self, tick):
+        # Jump to any tick by restoring the closest earlier snapshot and re-simulating from it
+        start = max(t for t in self.snapshots if t <= tick)
+        self.restore(self.snapshots[start])
+        self.sim_clock.time = self.now
+        self.tick = start
+        self.play(tick)
+
+
+def check_seek(log, checks=8, **kwargs):
+    # Ticks where seeking lands on a different state than playing straight through
+    ticks = sorted({len(log.ticks) * i // checks for i in range(1, checks + 1)})
+    straight = ReplayGame(log, **kwargs)
+    expected = {}
+    for tick in ticks:
+        straight.play(tick)
+        expected[tick] = straight.snapshot()
+    game = ReplayGame(log, **kwargs)
+    game.play()
+    mismatches = []
+    for tick in reversed(ticks):  # Backwards, so every seek restores an earlier snapshot
+        game.seek(tick)
+        if game.snapshot() != expected[tick]:
+            mismatches.append(tick)
+    return ticks, mismatches
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a recorded SoyBoyz Adventure session")
+    parser.add_argument("log", help="input log written with main.py --record")
+    parser.add_argument("--render", action="store_true", help="draw every tick (uncapped)")
+    parser.add_argument("--seek", type=int, metavar="TICK", help="stop at this tick")
+    parser.add_argument("--engine", action="store_true", help="simulate with the NumPy projectile engine")
+    parser.add_argument("--check-seek", action="store_true",
+                        help="check that seeking matches straight play, with and without the projectile engine")
+    args = parser.parse_args()
+    if args.engine and np is None:
+        parser.error("--engine needs numpy installed")
+
+    if args.check_seek:
+        log = InputLog(args.log)
+        failed = False
+        for engine in (False, True):
+            if engine and np is None:
+                print("projectile engine: skipped, numpy is not installed")
+                continue
+            ticks, mismatches = check_seek(log, snapshot_interval=max(1, len(log.ticks) // 5),
+                                           use_projectile_engine=engine)
+            name = "projectile engine" if engine else "sprite groups"
+            if mismatches:
+                print(f"{name}: seek differs from straight play at ticks {mismatches}")
+                failed = True
+            else:
+                print(f"{name}: seek matches straight play at ticks {ticks}")
+        pygame.quit()
+        sys.exit(1 if failed else 0)
+
+    game = ReplayGame(InputLog(args.log), render=args.render, use_projectile_engine=args.engine)
+    started = time.perf_counter()
+    game.play(args.seek)
+    elapsed = time.perf_counter() - started
+    print(f"Replayed {game.tick} ticks ({(game.now - game.log.start) / 1000:.1f}s of game time) in {elapsed:.2f}s: "
+          f"level {game.current_level + 1}, HP {game.player.hp}, outcome {game.outcome or 'none'}")
+    pygame.quit()
@@ -0,0 +1,161 @@
+import asyncio
+import time
+import pygame
+
+END_SCREEN_DURATION = 5000  # Milliseconds the win/lose message stays up
+
+
+# A scene runs one frame at a time and never blocks; the manager sleeps on the
+# asyncio loop between frames so other coroutines keep running
+class Scene:
+    fps = 60  # Frame rate cap while this scene is active
+
+    def __init__(self, game):
+        self.game = game
+
+    def enter(self):
+        pass
+
+    def frame(self):
+        pass
+
+    def end_frame(self):
+        # Called after the frame-rate sleep
+        pass
+
+
+class MenuScene(Scene):
+    fps = 30
+
+    def __init__(self, game):
+        super().__init__(game)
+        self.play_button = pygame.Rect(game.screen_width // 2 - 100, 300, 200, 50)
+        self.exit_button = pygame.Rect(game.screen_width // 2 - 100, 400, 200, 50)
+        self.needs_redraw = True
+        self.shown_ready = False  # Whether the last draw had the assets loaded
+
+    def enter(self):
+        self.needs_redraw = True
+
+    def draw(self):
+        game = self.game
+        screen = game.screen
+        screen.fill((0, 0, 0))
+
+        # Display the title
+        title_text = game.text_cache.render(game.font, "SoyBoyz Adventure", (255, 255, 255))
+        screen.blit(title_text, (game.screen_width // 2 - title_text.get_width() // 2, 150))
+
+        # Play and Exit buttons; Play is greyed out until the assets have loaded
+        self.shown_ready = game.assets_ready
+        play_colour, play_label = ((0, 255, 0), "Play") if self.shown_ready else ((100, 100, 100), "Loading...")
+        pygame.draw.rect(screen, play_colour, self.play_button)
+        pygame.draw.rect(screen, (255, 0, 0), self.exit_button)
+        for button, label in ((self.play_button, play_label), (self.exit_button, "Exit")):
+            text = game.text_cache.render(game.button_font, label, (0, 0, 0))
+            screen.blit(text, (button.centerx - text.get_width() // 2, button.centery - text.get_height() // 2))
+
+        game.present()
+        game.first_frame_drawn()
+
+    def frame(self):
+        game = self.game
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                game.running = False
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                if self.play_button.collidepoint(event.pos) and game.assets_ready:
+                    game.reset_game()  # Reset the game state
+                    game.scenes.switch(PlayingScene(game))
+                    return
+                elif self.exit_button.collidepoint(event.pos):
+                    game.running = False
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self.needs_redraw = True
+
+        # The menu is static, only draw it again when the window asks for it or loading finished
+        if self.needs_redraw or self.shown_ready != game.assets_ready:
+            self.draw()
+            self.needs_redraw = False
+
+
+class PlayingScene(Scene):
+    def enter(self):
+        self.fps = self.game.tick_rate  # One simulation tick per frame
+        self.game.start_music()
+        self.game.warm_level(self.game.current_level + 1)
+        self.game.tick_clock()
+        self.game.start_recording()
+
+    def frame(self):
+        game = self.game
+        profiler = game.profiler
+        profiler.begin_frame()
+        game.tick_clock()
+        game.handle_events()
+        profiler.lap("events")
+        game.update()
+        if game.scenes.scene is self and game.governor.render_due():  # Not if the game just ended
+            game.draw()
+
+    def end_frame(self):
+        game = self.game
+        game.profiler.lap("tick")
+        game.profiler.end_frame(len(game.balls), len(game.player.arrows), len(game.soybeans))
+        game.govern()
+
+
+class EndScene(Scene):
+    fps = 10
+
+    def __init__(self, game, message, colour):
+        super().__init__(game)
+        self.message = message
+        self.colour = colour
+        self.shown_at = 0
+
+    def enter(self):
+        game = self.game
+        game.tick_clock()
+        self.shown_at = game.get_ticks()
+        game.screen.fill((0, 0, 0))
+        text = game.text_cache.render(game.font, self.message, self.colour)
+        game.screen.blit(text, (game.screen_width // 2 - text.get_width() // 2, game.screen_height // 2 - text.get_height() // 2))
+        game.present()
+
+    def frame(self):
+        game = self.game
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                game.running = False
+        game.tick_clock()
+        if game.get_ticks() - self.shown_at >= END_SCREEN_DURATION:
+            game.reset_game()  # Reset the game state
+            game.scenes.switch(MenuScene(game))  # Go back to the main menu
+
+
+# Runs the active scene at its frame-rate cap, yielding to the event loop between frames
+class SceneManager:
+    def __init__(self, scene):
+        self.scene = scene
+        self.entered = False
+
+    def switch(self, scene):
+        self.scene = scene
+        scene.enter()
+
+    async def run(self, game):
+        if not self.entered:
+            self.scene.enter()
+            self.entered = True
+        next_frame = time.perf_counter()
+        while game.running:
+            scene = self.scene
+            scene.frame()
+            next_frame += 1 / scene.fps
+            delay = next_frame - time.perf_counter()
+            if delay < 0:
+                next_frame = time.perf_counter()  # Running late, don't try to catch up
+                delay = 0
+            await asyncio.sleep(delay)
+            scene.end_frame()
@@ -0,0 +1,22 @@
+# Simulation helpers shared by the headless runner and the replay player
+
+
+# Simulated millisecond clock, used in place of pygame.time.get_ticks
+class SimClock:
+    def __init__(self, start=0.0):
+        self.time = start
+
+    def advance(self, ms):
+        self.time += ms
+
+    def __call__(self):
+        return int(self.time)
+
+
+# Key state that can be indexed like pygame.key.get_pressed()
+class PressedKeys(frozenset):
+    def __getitem__(self, key):
+        return key in self
+
+
+NO_KEYS = PressedKeys()
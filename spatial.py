@@ -0,0 +1,119 @@
+from collections import defaultdict
+
+SPATIAL_CELL_SIZE = 100  # 10x8 cells over the 1000x800 playfield
+BUCKET_THRESHOLD = 32  # From this many rects to place, the rects tested are bucketed first
+
+
+# Uniform grid used as a broadphase for swept collisions
+class SpatialHash:
+    def __init__(self, cell_size=SPATIAL_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = defaultdict(list)
+        self.order = {}  # sprite -> insertion index, keeps group order for results
+
+    def cell_range(self, rect):
+        size = self.cell_size
+        # right/bottom are exclusive, colliderect ignores rects that only touch at an edge
+        return (rect.left // size, (rect.right - 1) // size,
+                rect.top // size, (rect.bottom - 1) // size)
+
+    def rebuild(self, sprites, bounds=None):
+        # bounds maps a sprite to the rect it is filed under, its own rect by default
+        self.cells.clear()
+        self.order.clear()
+        cells = self.cells
+        for index, sprite in enumerate(sprites):
+            self.order[sprite] = index
+            x0, x1, y0, y1 = self.cell_range(sprite.rect if bounds is None else bounds(sprite))
+            for cx in range(x0, x1 + 1):
+                for cy in range(y0, y1 + 1):
+                    cells[(cx, cy)].append(sprite)
+
+    def cells_near(self, rect):
+        # Set of sprites filed in the cells the rect touches
+        x0, x1, y0, y1 = self.cell_range(rect)
+        cells = self.cells
+        found = set()
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    found.update(bucket)
+        return found
+
+    def nearby(self, rect):
+        # Candidates sharing a cell with the rect, in insertion order, for callers doing their own test
+        return sorted(self.cells_near(rect), key=self.order.__getitem__)
+
+
+def rect_hits(rects, others, column_width=SPATIAL_CELL_SIZE):
+    # For each rect of others, in order, the ascending indices of the rects it overlaps.
+    # Few others test every rect with the C collidelistall; many bucket the rects into
+    # screen columns first, so each only tests the columns it spans
+    if len(others) < BUCKET_THRESHOLD:
+        return [other.collidelistall(rects) for other in others]
+    columns = {}
+    for index, rect in enumerate(rects):
+        first = rect.left // column_width
+        last = (rect.right - 1) // column_width
+        while first <= last:
+            column = columns.get(first)
+            if column is None:
+                column = columns[first] = ([], [])
+            column[0].append(rect)
+            column[1].append(index)
+            first += 1
+    hits = []
+    for other in others:
+        first = other.left // column_width
+        last = (other.right - 1) // column_width
+        if first == last:
+            column = columns.get(first)
+            hits.append([column[1][k] for k in other.collidelistall(column[0])] if column else [])
+            continue
+        found = set()  # A rect filed in several columns can be found more than once
+        for cx in range(first, last + 1):
+            column = columns.get(cx)
+            if column:
+                found.update(column[1][k] for k in other.collidelistall(column[0]))
+        hits.append(sorted(found))
+    return hits
+
+
+def spritecollide(sprite, group, dokill):
+    # Same result as pygame.sprite.spritecollide, with the rect tests done in C
+    sprites = group.sprites()
+    crashed = [sprites[i] for i in sprite.rect.collidelistall([other.rect for other in sprites])]
+    if dokill:
+        for other in crashed:
+            other.kill()
+    return crashed
+
+
+def groupcollide(groupa, groupb, dokilla, dokillb):
+    # Same result as pygame.sprite.groupcollide. Every sprite of groupb (the arrows, the
+    # smaller group) is tested against groupa's rects, then the hits are resolved in
+    # groupa order, so sprites of groupb killed by an earlier sprite are skipped
+    spritesa = groupa.sprites()
+    spritesb = groupb.sprites()
+    if not spritesa or not spritesb:
+        return {}
+    hits = {}  # index into spritesa -> indices into spritesb, ascending
+    for j, found in enumerate(rect_hits([sprite.rect for sprite in spritesa], [other.rect for other in spritesb])):
+        for i in found:
+            hits.setdefault(i, []).append(j)
+    crashed = {}
+    taken = set()
+    for i in sorted(hits):
+        collision = [spritesb[j] for j in hits[i] if j not in taken]
+        if not collision:
+            continue
+        sprite = spritesa[i]
+        crashed[sprite] = collision
+        if dokillb:
+            taken.update(hits[i])
+            for other in collision:
+                other.kill()
+        if dokilla:
+            sprite.kill()
+    return crashed
@@ -0,0 +1,107 @@
+import heapq
+import math
+
+# Wave patterns as data: each entry names the layout and its parameters
+#   burst: count balls from one random edge point, fanned around the player, delay ms apart
+#   ring:  count balls on a circle of radius around the player, all closing in at once
+#   sweep: count balls spread along one random edge, each crossing straight over, delay ms apart
+WAVE_PATTERNS = {
+    "burst": {"layout": "burst", "count": 6, "delay": 90, "spread": 25},
+    "ring": {"layout": "ring", "count": 12, "radius": 420},
+    "sweep": {"layout": "sweep", "count": 10, "delay": 120},
+}
+
+
+def wave_spawns(pattern, rng, width, height, target):
+    # Expands a pattern into (delay, (x, y, target_x, target_y)) ball spawns
+    layout = pattern["layout"]
+    count = pattern["count"]
+    tx, ty = target
+    spawns = []
+    if layout == "burst":
+        x, y = rng.choice([(rng.randint(0, width), 0), (rng.randint(0, width), height),
+                           (0, rng.randint(0, height)), (width, rng.randint(0, height))])
+        base = math.atan2(ty - y, tx - x)
+        for i in range(count):
+            offset = math.radians(pattern["spread"]) * (i / max(count - 1, 1) - 0.5)
+            spawns.append((i * pattern["delay"], (x, y, x + math.cos(base + offset), y + math.sin(base + offset))))
+    elif layout == "ring":
+        start = rng.uniform(0, 2 * math.pi)
+        for i in range(count):
+            angle = start + 2 * math.pi * i / count
+            # Clamped to the screen, balls outside it are removed straight away
+            x = min(max(tx + pattern["radius"] * math.cos(angle), 0), width)
+            y = min(max(ty + pattern["radius"] * math.sin(angle), 0), height)
+            spawns.append((0, (x, y, tx, ty)))
+    elif layout == "sweep":
+        horizontal = rng.random() < 0.5
+        reverse = rng.random() < 0.5
+        for i in range(count):
+            along = (i + 0.5) / count
+            if reverse:
+                along = 1 - along
+            if horizontal:
+                x = along * width
+                spawns.append((i * pattern["delay"], (x, 0, x, height)))  # Top edge, straight down
+            else:
+                y = along * height
+                spawns.append((i * pattern["delay"], (0, y, width, y)))  # Left edge, straight across
+    else:
+        raise ValueError(f"Unknown wave layout {layout!r}")
+    return spawns
+
+
+# Spawn schedule on the simulation clock. A min-heap holds one-off spawns and the next
+# firing of each repeating stream; due() pops everything that falls due by now, in time
+# order, so a long frame catches up on all of its spawns in one batch
+class SpawnScheduler:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.heap = []  # (time, sequence, stream name or None, generation, payload)
+        self.sequence = 0  # Tie breaker keeping equal times in scheduling order
+        self.streams = {}  # name -> (interval, current generation)
+        self.started = False
+
+    def push(self, time, name, generation, payload):
+        heapq.heappush(self.heap, (time, self.sequence, name, generation, payload))
+        self.sequence += 1
+
+    def at(self, time, payload):
+        self.push(time, None, 0, payload)
+
+    def every(self, name, interval, now, payload):
+        # (Re)starts a repeating stream whose first firing is one interval from now;
+        # entries of the stream's previous generation are skipped when they come up
+        generation = self.streams[name][1] + 1 if name in self.streams else 0
+        self.streams[name] = (interval, generation)
+        self.push(now + interval, name, generation, payload)
+
+    def cancel(self, name):
+        # A new generation with nothing scheduled, so the pending entry is skipped
+        if name in self.streams:
+            interval, generation = self.streams[name]
+            self.streams[name] = (interval, generation + 1)
+
+    def due(self, now):
+        # Yields (time, payload) for every spawn due by now; anything scheduled while
+        # iterating that is already due is yielded in the same pass
+        heap = self.heap
+        while heap and heap[0][0] <= now:
+            time, _, name, generation, payload = heapq.heappop(heap)
+            if name is not None:
+                stream = self.streams.get(name)
+                if stream is None or stream[1] != generation:
+                    continue  # Stream was restarted or cancelled
+                self.push(time + stream[0], name, generation, payload)
+            yield time, payload
+
+    def state(self):
+        # Plain-data copy for game snapshots; heap entries are immutable tuples
+        return list(self.heap), self.sequence, dict(self.streams), self.started
+
+    def set_state(self, state):
+        heap, self.sequence, streams, self.started = state
+        self.heap = list(heap)
+        self.streams = dict(streams)
@@ -0,0 +1,70 @@
+import pygame
+from spatial import SpatialHash
+
+# Swept (continuous) collision: every object is treated as a circle moving in a straight
+# line during the tick, so fast or coarsely stepped objects cannot pass through each other
+
+
+def swept_hit(ax, ay, amx, amy, bx, by, bmx, bmy, radius):
+    # a and b end the tick at (ax, ay) and (bx, by) after moving by (amx, amy) and (bmx, bmy).
+    # True if their centres came within radius of each other at any point of the tick;
+    # in b's frame a moves along a segment, tested against a circle around the origin
+    sx = (ax - amx) - (bx - bmx)
+    sy = (ay - amy) - (by - bmy)
+    ex = (ax - bx) - sx
+    ey = (ay - by) - sy
+    length = ex * ex + ey * ey
+    t = 0.0 if length == 0 else min(max(-(sx * ex + sy * ey) / length, 0.0), 1.0)
+    px = sx + ex * t
+    py = sy + ey * t
+    return px * px + py * py <= radius * radius
+
+
+def path_rect(x, y, mx, my, radius):
+    # Rect covering a centre's path over the tick, grown by radius
+    left = min(x, x - mx) - radius
+    top = min(y, y - my) - radius
+    return pygame.Rect(int(left), int(top), int(abs(mx) + 2 * radius) + 2, int(abs(my) + 2 * radius) + 2)
+
+
+def swept_spritecollide(center, moved, group, radius, scale, dokill):
+    # Sprites of group that touched a circle ending at center after moving by moved;
+    # group sprites move by their (dx, dy) times scale
+    x, y = center
+    mx, my = moved
+    crashed = []
+    for sprite in group.sprites():
+        sx, sy = sprite.rect.center
+        if swept_hit(x, y, mx, my, sx, sy, sprite.dx * scale, sprite.dy * scale, radius):
+            crashed.append(sprite)
+    if dokill:
+        for sprite in crashed:
+            sprite.kill()
+    return crashed
+
+
+def swept_groupcollide(groupa, groupb, radius, scale, dokilla, dokillb, grid=None):
+    # Same result layout as pygame.sprite.groupcollide, with swept circle tests. The grid
+    # holds the path rects of groupb, so only sprites whose paths can meet are tested
+    if grid is None:
+        grid = SpatialHash()
+    grid.rebuild(groupb, lambda s: path_rect(s.rect.centerx, s.rect.centery, s.dx * scale, s.dy * scale, 0))
+    crashed = {}
+    for sprite in groupa.sprites():
+        x, y = sprite.rect.center
+        mx, my = sprite.dx * scale, sprite.dy * scale
+        collision = []
+        for other in grid.nearby(path_rect(x, y, mx, my, radius)):
+            if not groupb.has(other):
+                continue  # Already killed by an earlier sprite of groupa
+            ox, oy = other.rect.center
+            if swept_hit(x, y, mx, my, ox, oy, other.dx * scale, other.dy * scale, radius):
+                collision.append(other)
+        if collision:
+            crashed[sprite] = collision
+            if dokillb:
+                for other in collision:
+                    other.kill()
+            if dokilla:
+                sprite.kill()
+    return crashed